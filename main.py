@@ -6,10 +6,17 @@ Coordinates all components: data loading, hotkey detection, screen capture,
 image recognition, and overlay display.
 """
 
+import os
 import sys
 import io
+import queue
+import threading
+import traceback
+from datetime import datetime
 from pathlib import Path
 
+import cv2
+
 # Fix encoding for Windows console and disable buffering
 # Note: When running as GUI app (PyInstaller with console=False), stdout/stderr may be None
 if sys.platform == 'win32' and sys.stdout is not None and hasattr(sys.stdout, 'buffer'):
@@ -25,7 +32,7 @@ from src.settings_manager import SettingsManager
 from src.settings_gui import SettingsGUI
 from src.localization import UI_TEXTS, get_text
 from src.capture_frame import CaptureFrame
-from src.config import CAPTURE_FRAME_THICKNESS, DEBUG_MODE
+from src.config import CAPTURE_FRAME_THICKNESS, CAPTURE_FRAME_READY_TIMEOUT, DEBUG_MODE, DEBUG_CAPTURES
 
 
 def flush_print(*args, **kwargs):
@@ -33,7 +40,8 @@ def flush_print(*args, **kwargs):
     # Only print if stdout exists (in console mode)
     if sys.stdout is not None:
         print(*args, **kwargs)
-        if hasattr(sys.stdout, 'flush'):
+        # A line-buffered stream (the Windows console wrapper above) already flushed on the newline
+        if not getattr(sys.stdout, 'line_buffering', False) and hasattr(sys.stdout, 'flush'):
             sys.stdout.flush()
 
 
@@ -60,6 +68,46 @@ class ArcHelper:
         self.settings_gui = None
         self.capture_frame = None
 
+        # Debug captures are written by a background thread so disk I/O never blocks recognition
+        self._debug_queue = queue.Queue(maxsize=4)
+        if DEBUG_MODE and DEBUG_CAPTURES:
+            threading.Thread(target=self._debug_writer_loop, daemon=True).start()
+
+    def _debug_writer_loop(self):
+        """Write queued debug screenshots to disk (runs in a daemon thread)."""
+        if getattr(sys, 'frozen', False):
+            # Running as exe - save next to executable
+            debug_dir = Path(sys.executable).parent / "Debug"
+        else:
+            # Running as script - save in project root
+            debug_dir = Path(__file__).parent / "Debug"
+
+        while True:
+            screenshot_path, image = self._debug_queue.get()
+            try:
+                debug_dir.mkdir(exist_ok=True)
+                # Uncompressed PNG: debug captures are tiny, so skipping zlib is cheaper than the disk space
+                cv2.imwrite(str(debug_dir / screenshot_path), image, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+                print(f"[DEBUG] Screenshot saved to: {debug_dir / screenshot_path}")
+            except Exception as e:
+                print(f"[WARN] Failed to save debug screenshot: {e}")
+
+    def _queue_debug_capture(self, image):
+        """Hand a copy of a capture to the debug writer, dropping the oldest one if the queue is full."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        entry = (f"capture_{timestamp}.png", image.copy())
+        try:
+            self._debug_queue.put_nowait(entry)
+        except queue.Full:
+            try:
+                self._debug_queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._debug_queue.put_nowait(entry)
+            except queue.Full:
+                pass
+
     def on_settings_saved(self):
         """Callback when settings are saved."""
         flush_print("\n✓ Settings saved!")
@@ -68,12 +116,10 @@ class ArcHelper:
     def on_settings_closed(self):
         """Callback when settings window is closed."""
         flush_print("\nSettings window closed. Exiting application...")
-        # Stop the application
+        # Stop the application: wakes the main thread, which cleans up and exits
+        # (this runs on the shared GUI thread, so it must not raise SystemExit here)
         if self.hotkey_manager:
             self.hotkey_manager.stop()
-        # Exit the program
-        import sys
-        sys.exit(0)
 
     def initialize(self):
         """Initialize all components."""
@@ -132,7 +178,8 @@ class ArcHelper:
 
         # Create a wrapper to test callback
         def hotkey_wrapper():
-            flush_print(f"\n[DEBUG] Hotkey callback invoked for: {recognition_hotkey}")
+            if DEBUG_MODE:
+                flush_print(f"\n[DEBUG] Hotkey callback invoked for: {recognition_hotkey}")
             self.on_hotkey_pressed()
 
         self.hotkey_manager.register_hotkey(recognition_hotkey, hotkey_wrapper)
@@ -158,23 +205,18 @@ class ArcHelper:
 
         # Show settings window (non-blocking)
         flush_print("Opening settings window...")
-        self.settings_gui = SettingsGUI(self.settings_manager, self.on_settings_saved)
+        self.settings_gui = SettingsGUI(self.settings_manager, self.on_settings_saved, parent=self.overlay.root)
         self.settings_gui.on_close_callback = self.on_settings_closed
         self.settings_gui.show(blocking=False)
 
     def on_hotkey_pressed(self):
         """Callback when hotkey is pressed."""
-        import threading
-        import cv2
-        from datetime import datetime
-        import threading as _threading
-
         print(f"\n{'='*60}")
         print(f"[HOTKEY] Recognition hotkey triggered!")
         print(f"{'='*60}")
 
         # Create a cancellation event for this recognition cycle
-        cancel_event = _threading.Event()
+        cancel_event = threading.Event()
 
         def process_in_thread():
             try:
@@ -185,11 +227,13 @@ class ArcHelper:
                 cursor_x, cursor_y = self.screen_capture.get_cursor_position()
 
                 # Show capture frame at cursor position
-                self.capture_frame.show(cursor_x, cursor_y, capture_size[0], capture_size[1], duration=0.25, auto_hide=True)
+                frame_ready = threading.Event()
+                self.capture_frame.show(cursor_x, cursor_y, capture_size[0], capture_size[1], duration=0.25,
+                                        auto_hide=True, ready_event=frame_ready)
 
-                # Wait for frame to be visible (0.5 seconds
-                import time
-                time.sleep(0.5)
+                # Wait until the frame is drawn (the frame is only visual feedback, so never wait long;
+                # the capture covers the inner area, which the frame does not paint)
+                frame_ready.wait(timeout=CAPTURE_FRAME_READY_TIMEOUT)
 
                 print("[INFO] Capturing screen (inner area of frame)...")
 
@@ -200,8 +244,9 @@ class ArcHelper:
                 inner_size = (inner_width, inner_height)
 
                 # Capture screen region under mouse cursor with inner size
-                # The cursor is at the center, so this captures the area inside the frame
-                image = self.screen_capture.capture_at_cursor(size=inner_size)
+                # Use the position the frame was placed at (the cursor may have moved since),
+                # so the capture is exactly the area inside the frame and never its border
+                image = self.screen_capture.capture_at_cursor(size=inner_size, position=(cursor_x, cursor_y))
 
                 # NOW show loading overlay after screenshot is captured
                 # Do NOT close existing overlays - allow multiple overlays to coexist
@@ -222,20 +267,9 @@ class ArcHelper:
                     self._show_not_recognized()
                     return
 
-                # Save screenshot to Debug folder only in debug mode (development)
-                if DEBUG_MODE:
-                    if getattr(sys, 'frozen', False):
-                        # Running as exe - save next to executable
-                        debug_dir = Path(sys.executable).parent / "Debug"
-                    else:
-                        # Running as script - save in project root
-                        debug_dir = Path(__file__).parent / "Debug"
-                    debug_dir.mkdir(exist_ok=True)
-
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    screenshot_path = debug_dir / f"capture_{timestamp}.png"
-                    cv2.imwrite(str(screenshot_path), image)
-                    print(f"[DEBUG] Screenshot saved to: {screenshot_path}")
+                # Save screenshot to Debug folder only when debug captures are enabled (development)
+                if DEBUG_MODE and DEBUG_CAPTURES:
+                    self._queue_debug_capture(image)
 
                 print("[INFO] Recognizing item...")
 
@@ -256,7 +290,7 @@ class ArcHelper:
                     if item_data:
                         print(f"[INFO] Recognized: {item_data['name']['en']} (confidence: {score:.2%})")
                         # Log detailed scores for debugging
-                        if details:
+                        if DEBUG_MODE and details:
                             print(f"[DEBUG] Score breakdown: hist={details.get('histogram', 0):.2f}, "
                                   f"eq={details.get('template_equalized', 0):.2f}, "
                                   f"orb={details.get('orb_features', 0):.2f}, "
@@ -287,7 +321,6 @@ class ArcHelper:
 
             except Exception as e:
                 print(f"[ERROR] Error processing hotkey: {e}")
-                import traceback
                 traceback.print_exc()
             finally:
                 # Clear close callback after this cycle completes
@@ -341,6 +374,10 @@ class ArcHelper:
             self.overlay.cleanup()
         if self.capture_frame:
             self.capture_frame.cleanup()
+        if self.screen_capture:
+            self.screen_capture.cleanup()
+        if self.recognizer:
+            self.recognizer.cleanup()
         if self.settings_gui:
             self.settings_gui.cleanup()
         print("Goodbye!")
@@ -351,6 +388,18 @@ def main():
     app = ArcHelper()
     app.run()
 
+    # Everything worth keeping was released in cleanup(); skip interpreter teardown
+    # (finalizing Tk, OpenCV and the item data), which shows as a hang on close.
+    # Development runs exit normally so shutdown problems still surface.
+    if not DEBUG_MODE:
+        for stream in (sys.stdout, sys.stderr):
+            if stream is not None:
+                try:
+                    stream.flush()
+                except Exception:
+                    pass
+        os._exit(0)
+
 
 if __name__ == "__main__":
     main()
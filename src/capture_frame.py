@@ -1,8 +1,9 @@
 """Capture frame overlay to show screen capture area before capturing."""
 
 import tkinter as tk
+import threading
 import time
-from typing import Optional
+from typing import List, Optional
 from src.config import CAPTURE_FRAME_THICKNESS
 
 
@@ -19,8 +20,11 @@ class CaptureFrame:
         self.parent = parent
         self.window: Optional[tk.Toplevel] = None
         self.is_showing = False
+        self._bars: List[tk.Frame] = []  # Border frames recolored by the flash animation
+        self._after_ids: List[str] = []  # Pending flash/auto-hide callbacks, cancelled in hide()
 
-    def show(self, x: int, y: int, width: int, height: int, duration: float = 0.5, auto_hide: bool = True):
+    def show(self, x: int, y: int, width: int, height: int, duration: float = 0.5, auto_hide: bool = True,
+             ready_event: Optional[threading.Event] = None):
         """
         Show a flashing frame at the specified position.
 
@@ -31,6 +35,7 @@ class CaptureFrame:
             height: Frame height
             duration: How long to show the frame in seconds (default: 0.5)
             auto_hide: Automatically hide after duration (default: True)
+            ready_event: Optional event set once Tk has drawn the frame (or failed to)
         """
         # Calculate top-left corner (centered on x, y)
         left = x - width // 2
@@ -38,12 +43,13 @@ class CaptureFrame:
 
         # Create window in GUI thread using after() to ensure thread safety
         if self.parent:
-            self.parent.after(0, lambda: self._create_window(left, top, width, height, duration, auto_hide))
+            self.parent.after(0, lambda: self._create_window(left, top, width, height, duration, auto_hide, ready_event))
         else:
             # Fallback if no parent (shouldn't happen)
-            self._create_window(left, top, width, height, duration, auto_hide)
+            self._create_window(left, top, width, height, duration, auto_hide, ready_event)
 
-    def _create_window(self, left: int, top: int, width: int, height: int, duration: float, auto_hide: bool):
+    def _create_window(self, left: int, top: int, width: int, height: int, duration: float, auto_hide: bool,
+                       ready_event: Optional[threading.Event] = None):
         """Create the frame window (must be called from GUI thread)."""
         try:
             # Create toplevel window with parent to avoid creating extra root windows
@@ -84,40 +90,44 @@ class CaptureFrame:
             center = tk.Frame(self.window, bg='black')
             center.pack(expand=True, fill=tk.BOTH)
 
+            self._bars = [top_bar, bottom_bar, left_bar, right_bar]
+
             # Make sure window is visible
             self.window.update_idletasks()
             self.is_showing = True
 
+            # Signal waiters once Tk is idle again, i.e. the frame has been drawn
+            if ready_event is not None:
+                self.window.after_idle(ready_event.set)
+
             # Start flashing animation
-            self._flash_animation(0)
+            self._flash_animation()
 
             # Schedule auto-close after duration if requested
             if auto_hide and self.window:
-                self.window.after(int(duration * 1000), self.hide)
+                self._after_ids.append(self.window.after(int(duration * 1000), self.hide))
 
         except Exception as e:
             print(f"[ERROR] Failed to create capture frame: {e}")
             self.window = None
-
-    def _flash_animation(self, count: int):
-        """Animate the frame with flashing effect."""
+            if ready_event is not None:
+                ready_event.set()
+
+    def _flash_animation(self):
+        """Animate the frame with flashing effect (the whole sequence is scheduled up front)."""
+        # Alternate between bright green and yellow, 10 times per second for 0.5 seconds
+        colors = ['#00FF00', '#FFFF00']
+        for count in range(1, 6):
+            self._after_ids.append(self.window.after(100 * count, self._set_bar_color, colors[count % len(colors)]))
+
+    def _set_bar_color(self, color: str):
+        """Recolor the border frames (one flash step)."""
         if not self.window or not self.is_showing:
             return
 
         try:
-            # Alternate between bright green and yellow
-            colors = ['#00FF00', '#FFFF00']
-            color = colors[count % len(colors)]
-
-            # Update all borders
-            for widget in self.window.winfo_children():
-                if isinstance(widget, tk.Frame) and widget.cget('bg') != 'black':
-                    widget.configure(bg=color)
-
-            # Schedule next flash (10 times per second = smooth animation)
-            if count < 5:  # Flash 5 times during 0.5 seconds
-                self.window.after(100, lambda: self._flash_animation(count + 1))
-
+            for bar in self._bars:
+                bar.configure(bg=color)
         except Exception as e:
             print(f"[ERROR] Flash animation error: {e}")
 
@@ -126,11 +136,15 @@ class CaptureFrame:
         self.is_showing = False
         if self.window:
             try:
+                for after_id in self._after_ids:
+                    self.window.after_cancel(after_id)
                 self.window.destroy()
             except Exception as e:
                 print(f"[ERROR] Failed to destroy capture frame: {e}")
             finally:
                 self.window = None
+                self._bars = []
+                self._after_ids = []
 
     def cleanup(self):
         """Cleanup resources."""
@@ -4,6 +4,7 @@ import sys
 
 # Debug mode (disabled in frozen/compiled builds, enabled in development)
 DEBUG_MODE = not getattr(sys, 'frozen', False)
+DEBUG_CAPTURES = False  # Save every hotkey capture to the Debug/ folder (only honored in debug mode)
 
 # Hotkey configuration
 DEFAULT_HOTKEY = 'ctrl+r'  # Hotkey to trigger item recognition
@@ -13,15 +14,35 @@ HOTKEY_DEBOUNCE_DELAY = 0.5  # Minimum delay between hotkey triggers in seconds
 ICON_SIZE = (160, 160)  # Expected size of item icons
 MATCH_THRESHOLD = 0.4  # Similarity threshold for image matching (0.0-1.0)
 MATCH_THRESHOLD_LOW = 0.3  # Lower threshold for "possible match" suggestions
+PHASH_CANDIDATES = 64  # Templates fully scored after the perceptual-hash prefilter (0 = score all)
+PYRAMID_LEVELS = 2  # cv2.pyrDown steps for the coarse candidate pass (160px icons -> 40px at 2 levels)
+PYRAMID_CANDIDATES = 8  # Best coarse NCC matches added to the fully scored candidates (0 = off)
+# Weight of each method in the combined match score (weighted average; a 0 weight skips the method,
+# e.g. orb_features/sift_features = 0 for a faster, less robust mode)
+SCORE_WEIGHTS = {
+    'template_ccoeff': 0.20,     # TM_CCOEFF_NORMED on grayscale
+    'template_ccorr': 0.10,      # TM_CCORR_NORMED on grayscale
+    'template_equalized': 0.25,  # TM_CCOEFF_NORMED on histogram-equalized grayscale
+    'histogram': 0.15,           # 8x8x8 color histogram correlation
+    'orb_features': 0.15,        # ORB descriptor matches
+    'sift_features': 0.15,       # SIFT descriptor matches (when available)
+}
+ORB_FEATURES = 500  # Max ORB keypoints per image (changing it shifts match scores)
+USE_TEMPLATE_CACHE = True  # Cache preprocessed templates in template_cache.npz between runs
+USE_ITEM_CACHE = True  # Cache the parsed item/hideout/project database in item_cache.pkl between runs
+USE_OPENCL = True  # Run OpenCV feature extraction through OpenCL (GPU) when a device is available
 
 # Screen capture settings
 CAPTURE_SIZE = (160, 160)  # Size of the region to capture around cursor
 CAPTURE_FRAME_THICKNESS = 4  # Thickness of capture frame border in pixels
+CAPTURE_FRAME_READY_TIMEOUT = 0.05  # Max wait in seconds for the capture frame to be drawn before capturing
+USE_DXGI_CAPTURE = True  # Use DXGI Desktop Duplication (dxcam) when installed instead of GDI grabs
 
 # Overlay settings
 OVERLAY_WIDTH = 620
 OVERLAY_HEIGHT = 650
 OVERLAY_ALPHA = 0.97  # Transparency (0.0-1.0, 1.0 = opaque)
+OVERLAY_QUEUE_POLL_MS = 500  # Fallback poll interval of the overlay command queue (commands normally wake the GUI thread)
 
 # Language settings
 DEFAULT_LANGUAGE = 'en'  # Default language for item names/descriptions
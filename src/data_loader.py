@@ -1,23 +1,97 @@
 """Data loader module for parsing item JSON files."""
 
+import hashlib
 import json
+import os
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+import numpy as np
+
+from src.config import USE_ITEM_CACHE
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Bump when the cached item payload changes shape
+ITEM_CACHE_VERSION = 3
+
+
+def _intern(value):
+    """
+    Intern an id string, so every mapping shares one object per id.
+
+    Args:
+        value: Id read from JSON (non-strings are returned unchanged)
+
+    Returns:
+        The interned string, or value itself
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class HideoutUse(NamedTuple):
+    """One hideout bench level that requires an item."""
+    bench_id: str
+    level: Optional[int]
+    quantity: int
+
+
+def _read_json(json_file: Path):
+    """
+    Read and parse one JSON file (runs in a worker thread).
+
+    Uses orjson when installed (its JSONDecodeError subclasses json.JSONDecodeError).
+
+    Args:
+        json_file: Path to the JSON file
+
+    Returns:
+        Parsed data, or the exception raised while reading/parsing
+    """
+    try:
+        if ORJSON_AVAILABLE:
+            return orjson.loads(json_file.read_bytes())
+        with open(json_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        return e
 
 
 class ItemDatabase:
     """Manages loading and querying item + hideout bench data."""
 
-    def __init__(self, data_dir: Path):
+    # Attributes restored from / saved to the item cache
+    _CACHED_ATTRS = ('items', 'reverse_recipes', 'hideout_benches', 'hideout_usage',
+                     'projects', 'project_required_items', '_id_array', '_lower_names')
+
+    def __init__(self, data_dir: Path, cache_file: Path = None):
         """
         Initialize the item database.
 
         Args:
             data_dir: Path to the Data directory
+            cache_file: Path to the parsed item cache. Defaults to item_cache.pkl next to executable.
         """
         self.data_dir = Path(data_dir)
+        if cache_file is None:
+            # Same location rules as settings.json
+            if getattr(sys, 'frozen', False):
+                cache_file = Path(sys.executable).parent / "item_cache.pkl"
+            else:
+                cache_file = Path(__file__).parent.parent / "item_cache.pkl"
+        self.cache_file = Path(cache_file)
         self.items_dir = self.data_dir / "Items"
         self.items: Dict[str, dict] = {}
+        # Scan index for search_by_name: item ids plus lowercased names per language (built at load time)
+        self._id_array: Optional[np.ndarray] = None
+        self._lower_names: Dict[str, np.ndarray] = {}
         self.reverse_recipes: Dict[str, List[str]] = {}  # material_id -> [item_ids that use it]
 
         # Hideout benches (workstations) data
@@ -27,58 +101,198 @@ class ItemDatabase:
             if alt.exists():
                 self.hideout_dir = alt
         self.hideout_benches: Dict[str, dict] = {}
-        # item_id -> list of usage entries {bench_id, level, quantity}
-        self.hideout_usage: Dict[str, List[dict]] = {}
+        # item_id -> list of usage entries (bench_id, level, quantity)
+        self.hideout_usage: Dict[str, List[HideoutUse]] = {}
 
         # Projects (expeditions) data
         self.projects_file = self.data_dir / "projects.json"
         self.projects: List[dict] = []
         # Set of all item IDs required for projects
-        self.project_required_items: set = set()
+        self.project_required_items: FrozenSet[str] = frozenset()
 
     def load_all_items(self):
         """Load all item JSON files and hideout benches."""
         if not self.items_dir.exists():
             raise FileNotFoundError(f"Items directory not found: {self.items_dir}")
 
-        # Load all JSON files
-        for json_file in self.items_dir.glob("*.json"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    item_data = json.load(f)
-                    item_id = item_data.get('id')
+        json_files = list(self.items_dir.glob("*.json"))
+        hideout_files = list(self.hideout_dir.glob("*.json")) if self.hideout_dir.exists() else []
+
+        # Restore the parsed database when none of the data files changed
+        data_files = self._data_files(json_files, hideout_files)
+        stat_key = self._data_stat_key(data_files) if USE_ITEM_CACHE else None
+        if stat_key and self._load_item_cache(data_files, stat_key):
+            print(f"Loaded {len(self.items)} items (from cache)")
+            return
+
+        # Read item and hideout files on one thread pool (results keep glob order)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            parsed = list(executor.map(_read_json, json_files + hideout_files))
+        parsed, hideout_parsed = parsed[:len(json_files)], parsed[len(json_files):]
 
-                    if item_id:
-                        self.items[item_id] = item_data
-                    else:
-                        print(f"Warning: Item in {json_file.name} has no 'id' field")
+        for json_file, item_data in zip(json_files, parsed):
+            if isinstance(item_data, json.JSONDecodeError):
+                print(f"Error parsing {json_file.name}: {item_data}")
+                continue
+            if isinstance(item_data, Exception):
+                print(f"Error loading {json_file.name}: {item_data}")
+                continue
+
+            try:
+                item_id = _intern(item_data.get('id'))
+
+                if item_id:
+                    previous = self.items.get(item_id)
+                    if previous is not None:
+                        self._unlink_recipe(item_id, previous)
+                    self.items[item_id] = item_data
+                    # Build reverse recipe mapping while the item is at hand
+                    self._link_recipe(item_id, item_data)
+                else:
+                    print(f"Warning: Item in {json_file.name} has no 'id' field")
 
-            except json.JSONDecodeError as e:
-                print(f"Error parsing {json_file.name}: {e}")
             except Exception as e:
                 print(f"Error loading {json_file.name}: {e}")
 
-        # Build reverse recipe mapping
-        self._build_reverse_recipes()
+        # Lowercase every item name once, so searches only run substring tests
+        self._build_name_index()
 
         # Load hideout benches (non-fatal if missing)
-        self._load_hideout_benches()
-        self._build_hideout_usage()
+        self._load_hideout_benches(hideout_files, hideout_parsed)
 
         # Load projects (expeditions) data
         self._load_projects()
 
-    def _build_reverse_recipes(self):
-        """Build a mapping of materials to items that use them in recipes."""
-        self.reverse_recipes = {}
+        if stat_key:
+            fingerprint = self._data_fingerprint(data_files)
+            if fingerprint:
+                self._save_item_cache(stat_key, fingerprint)
+
+    # ---------------- Item cache -----------------
+    def _data_files(self, item_files: List[Path], hideout_files: List[Path]) -> List[Path]:
+        """
+        List the JSON files the database is built from, in a stable order.
+
+        Args:
+            item_files: Item JSON paths
+            hideout_files: Hideout bench JSON paths
+
+        Returns:
+            Sorted item files, sorted hideout files, then projects.json if present
+        """
+        data_files = sorted(item_files) + sorted(hideout_files)
+        if self.projects_file.exists():
+            data_files.append(self.projects_file)
+        return data_files
+
+    def _data_stat_key(self, data_files: List[Path]) -> Optional[str]:
+        """
+        Hash the names, sizes and modification times of the data files.
+
+        This is a cheap first check: when it matches the cache, the file contents
+        are not read at all.
+
+        Args:
+            data_files: Paths from _data_files
+
+        Returns:
+            Hex digest, or None if the files could not be stat'ed
+        """
+        digest = hashlib.sha1(f"{ITEM_CACHE_VERSION}".encode())
+        try:
+            for data_file in data_files:
+                stat = data_file.stat()
+                digest.update(f"{data_file.relative_to(self.data_dir).as_posix()}|{stat.st_size}|{stat.st_mtime_ns}|".encode('utf-8'))
+        except OSError as e:
+            print(f"Warning: Could not stat item data: {e}")
+            return None
+        return digest.hexdigest()
+
+    def _data_fingerprint(self, data_files: List[Path]) -> Optional[str]:
+        """
+        Hash the contents of the data files.
+
+        Used when the stat key does not match: PyInstaller re-extracts the Data
+        folder with fresh timestamps on every launch, so unchanged files must be
+        recognized by content.
 
-        for item_id, item_data in self.items.items():
-            recipe = item_data.get('recipe', {})
+        Args:
+            data_files: Paths from _data_files
+
+        Returns:
+            Hex digest, or None if the files could not be read
+        """
+        digest = hashlib.sha1(f"{ITEM_CACHE_VERSION}".encode())
+        try:
+            for data_file in data_files:
+                digest.update(data_file.relative_to(self.data_dir).as_posix().encode('utf-8'))
+                digest.update(data_file.read_bytes())
+        except OSError as e:
+            print(f"Warning: Could not fingerprint item data: {e}")
+            return None
+        return digest.hexdigest()
+
+    def _load_item_cache(self, data_files: List[Path], stat_key: str) -> bool:
+        """
+        Restore the parsed database from the cache file.
+
+        Args:
+            data_files: Paths from _data_files
+            stat_key: Current stat key of the data files
+
+        Returns:
+            True if the cache was valid and loaded, False otherwise
+        """
+        if not self.cache_file.exists():
+            return False
+
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cache = pickle.load(f)
+            if cache.get('stat_key') != stat_key:
+                fingerprint = self._data_fingerprint(data_files)
+                if fingerprint is None or cache.get('fingerprint') != fingerprint:
+                    return False
+            values = {name: cache[name] for name in self._CACHED_ATTRS}
+        except Exception as e:
+            print(f"Warning: Could not read item cache: {e}")
+            return False
+
+        for name, value in values.items():
+            setattr(self, name, value)
+        return True
+
+    def _save_item_cache(self, stat_key: str, fingerprint: str):
+        """
+        Write the parsed database to the cache file (atomically, via a temp file).
+
+        Args:
+            stat_key: Stat key of the data files the cache was built from
+            fingerprint: Content fingerprint of the same files
+        """
+        cache = {name: getattr(self, name) for name in self._CACHED_ATTRS}
+        cache['stat_key'] = stat_key
+        cache['fingerprint'] = fingerprint
 
-            for material_id in recipe.keys():
-                if material_id not in self.reverse_recipes:
-                    self.reverse_recipes[material_id] = []
-                self.reverse_recipes[material_id].append(item_id)
+        tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"Warning: Could not write item cache: {e}")
+
+    def _link_recipe(self, item_id: str, item_data: dict):
+        """Add an item to the reverse recipe mapping of each of its materials."""
+        for material_id in item_data.get('recipe', {}).keys():
+            self.reverse_recipes.setdefault(_intern(material_id), []).append(item_id)
+
+    def _unlink_recipe(self, item_id: str, item_data: dict):
+        """Remove an item that is being replaced from the reverse recipe mapping."""
+        for material_id in item_data.get('recipe', {}).keys():
+            users = self.reverse_recipes.get(material_id, [])
+            if item_id in users:
+                users.remove(item_id)
 
     def get_item(self, item_id: str) -> Optional[dict]:
         """
@@ -130,56 +344,91 @@ class ItemDatabase:
         Returns:
             List of matching item data dictionaries
         """
-        name_lower = name.lower()
-        results = []
+        if not self.items:
+            return []
+
+        # Vectorized substring scan over the contiguous lowercased names of this language
+        mask = np.char.find(self._get_lower_names(language), name.lower()) >= 0
+        return [self.items[item_id] for item_id in self._id_array[mask]]
+
+    def _build_name_index(self):
+        """Build the search index for every language present in the item names."""
+        self._id_array = None
+        self._lower_names = {}
+        languages = {language for item_data in self.items.values() for language in item_data.get('name', {})}
+        for language in sorted(languages):
+            self._get_lower_names(language)
+
+    def _get_lower_names(self, language: str) -> np.ndarray:
+        """
+        Get the lowercased item names of a language, aligned with self._id_array.
 
-        for item_data in self.items.values():
-            item_name = item_data.get('name', {}).get(language, '')
-            if name_lower in item_name.lower():
-                results.append(item_data)
+        Args:
+            language: Language code for the names
 
-        return results
+        Returns:
+            Array of lowercased names ('' where an item has no name in that language)
+        """
+        if self._id_array is None:
+            self._id_array = np.array(list(self.items.keys()), dtype=str)
+        names = self._lower_names.get(language)
+        if names is None:
+            names = np.char.lower(np.array(
+                [self.items[item_id].get('name', {}).get(language, '') for item_id in self._id_array.tolist()],
+                dtype=str))
+            self._lower_names[language] = names
+        return names
 
     # ---------------- Hideout benches -----------------
-    def _load_hideout_benches(self):
-        """Load all hideout bench JSON files if directory exists."""
-        if not self.hideout_dir.exists():
-            return
-        for json_file in self.hideout_dir.glob("*.json"):
+    def _load_hideout_benches(self, json_files: List[Path], parsed: list):
+        """
+        Store the parsed hideout bench files.
+
+        Args:
+            json_files: Hideout bench JSON paths (empty if the directory is missing)
+            parsed: Results of _read_json for json_files, in the same order
+        """
+        for json_file, bench_data in zip(json_files, parsed):
+            if isinstance(bench_data, json.JSONDecodeError):
+                print(f"Error parsing hideout bench {json_file.name}: {bench_data}")
+                continue
+            if isinstance(bench_data, Exception):
+                print(f"Error loading hideout bench {json_file.name}: {bench_data}")
+                continue
+
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    bench_data = json.load(f)
-                    bench_id = bench_data.get('id') or json_file.stem
-                    self.hideout_benches[bench_id] = bench_data
-            except json.JSONDecodeError as e:
-                print(f"Error parsing hideout bench {json_file.name}: {e}")
+                bench_id = _intern(bench_data.get('id') or json_file.stem)
+                if bench_id in self.hideout_benches:
+                    self._unlink_hideout_usage(bench_id)
+                self.hideout_benches[bench_id] = bench_data
+                # Build reverse mapping of item -> benches/levels while the bench is at hand
+                self._link_hideout_usage(bench_id, bench_data)
             except Exception as e:
                 print(f"Error loading hideout bench {json_file.name}: {e}")
 
-    def _build_hideout_usage(self):
-        """Build reverse mapping of item -> list of benches/levels where required."""
-        self.hideout_usage = {}
-        for bench_id, bench in self.hideout_benches.items():
-            levels = bench.get('levels', [])
-            for level_entry in levels:
-                level_num = level_entry.get('level')
-                reqs = level_entry.get('requirementItemIds', [])
-                if not isinstance(reqs, list):
+    def _link_hideout_usage(self, bench_id: str, bench: dict):
+        """Add the item requirements of every level of a bench to the usage mapping."""
+        levels = bench.get('levels', [])
+        for level_entry in levels:
+            level_num = level_entry.get('level')
+            reqs = level_entry.get('requirementItemIds', [])
+            if not isinstance(reqs, list):
+                continue
+            for req in reqs:
+                if not isinstance(req, dict):
+                    continue
+                item_id = _intern(req.get('itemId'))
+                quantity = req.get('quantity', 1)
+                if not item_id:
                     continue
-                for req in reqs:
-                    if not isinstance(req, dict):
-                        continue
-                    item_id = req.get('itemId')
-                    quantity = req.get('quantity', 1)
-                    if not item_id:
-                        continue
-                    self.hideout_usage.setdefault(item_id, []).append({
-                        'bench_id': bench_id,
-                        'level': level_num,
-                        'quantity': quantity
-                    })
-
-    def get_hideout_usage(self, item_id: str) -> List[dict]:
+                self.hideout_usage.setdefault(item_id, []).append(HideoutUse(bench_id, level_num, quantity))
+
+    def _unlink_hideout_usage(self, bench_id: str):
+        """Remove the usage entries of a bench that is being replaced."""
+        for uses in self.hideout_usage.values():
+            uses[:] = [use for use in uses if use.bench_id != bench_id]
+
+    def get_hideout_usage(self, item_id: str) -> List[HideoutUse]:
         """Return list of hideout usage entries for given item id."""
         return self.hideout_usage.get(item_id, [])
 
@@ -224,23 +473,30 @@ class ItemDatabase:
         if not self.projects_file.exists():
             return
 
+        projects = _read_json(self.projects_file)
+        if isinstance(projects, json.JSONDecodeError):
+            print(f"Error parsing projects.json: {projects}")
+            return
+        if isinstance(projects, Exception):
+            print(f"Error loading projects.json: {projects}")
+            return
+
         try:
-            with open(self.projects_file, 'r', encoding='utf-8') as f:
-                self.projects = json.load(f)
+            self.projects = projects
 
             # Build set of all required item IDs from all phases
+            required_items = set(self.project_required_items)
             for project in self.projects:
                 phases = project.get('phases', [])
                 for phase in phases:
                     requirements = phase.get('requirementItemIds', [])
                     for req in requirements:
                         if isinstance(req, dict):
-                            item_id = req.get('itemId')
+                            item_id = _intern(req.get('itemId'))
                             if item_id:
-                                self.project_required_items.add(item_id)
+                                required_items.add(item_id)
+            self.project_required_items = frozenset(required_items)
 
-        except json.JSONDecodeError as e:
-            print(f"Error parsing projects.json: {e}")
         except Exception as e:
             print(f"Error loading projects.json: {e}")
 
@@ -1,11 +1,18 @@
 """Hotkey management module for global hotkey detection."""
 
-import keyboard
+import sys
 import threading
 import time
 from typing import Callable
 from src.config import HOTKEY_DEBOUNCE_DELAY
 
+try:
+    import win32api
+    import win32event
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
 
 class HotkeyManager:
     """Manages global hotkey detection using the keyboard library."""
@@ -18,9 +25,32 @@ class HotkeyManager:
         """
         self.registered_hotkeys = []
         self.running = False
-        self._last_trigger_time = {}  # Track last trigger time per hotkey for debouncing
         self._debounce_delay = debounce_delay  # Minimum delay between triggers in seconds
-        self._hotkey_pressed = {}  # Track if hotkey is currently being held down
+        self._debounce_ns = int(debounce_delay * 1e9)  # Same delay in monotonic_ns units
+        self._release_hooks = {}  # hotkey -> keyboard hook that clears its pressed state on release
+        self._kb = None  # keyboard module, imported on first use (see _keyboard)
+
+        # wait() sleeps on this event until stop()/cleanup() signals it.
+        # On Windows a kernel event is used so Ctrl+C can wake the wait via the console handler
+        # (a plain threading.Event wait cannot be interrupted there).
+        self._stop_event = threading.Event()
+        self._win_stop_event = win32event.CreateEvent(None, True, False, None) if WIN32_AVAILABLE else None
+        self._interrupted = False
+
+    def _keyboard(self):
+        """
+        Import the keyboard library on first use.
+
+        Importing keyboard does OS-level setup (on Linux it probes /dev/input),
+        so it is deferred until a hotkey is actually registered.
+
+        Returns:
+            The keyboard module
+        """
+        if self._kb is None:
+            import keyboard
+            self._kb = keyboard
+        return self._kb
 
     def register_hotkey(self, hotkey: str, callback: Callable):
         """
@@ -34,47 +64,55 @@ class HotkeyManager:
             On Windows, this may require administrator privileges for global hotkey detection.
         """
         try:
+            keyboard = self._keyboard()
+
             # First, remove any existing registration for this hotkey
             try:
                 keyboard.remove_hotkey(hotkey)
             except:
                 pass
 
-            # Initialize the pressed state for this hotkey
-            self._hotkey_pressed[hotkey] = False
+            self._remove_release_hook(hotkey)
+
+            # Per-hotkey state shared by the callbacks below: [last trigger time in ns, held down]
+            state = [None, False]
+
+            # Resolve the combination to scan codes once, so the release check below
+            # does not re-parse key names on every event (each key may map to several codes)
+            release_scan_codes = frozenset(
+                code for step in keyboard.parse_hotkey(hotkey) for key_codes in step for code in key_codes
+            )
 
             # Create a wrapper that only triggers once per key press (not while held)
             def single_trigger_callback():
                 # Only trigger if this is the first press (not being held)
-                if not self._hotkey_pressed.get(hotkey, False):
-                    current_time = time.time()
-                    last_time = self._last_trigger_time.get(hotkey, 0)
+                if not state[1]:
+                    current_time = time.monotonic_ns()  # Immune to system clock changes
+                    last_time = state[0]
 
                     # Check if enough time has passed since last trigger
-                    if current_time - last_time >= self._debounce_delay:
-                        self._hotkey_pressed[hotkey] = True  # Mark as pressed
-                        self._last_trigger_time[hotkey] = current_time
+                    if last_time is None or current_time - last_time >= self._debounce_ns:
+                        state[1] = True  # Mark as pressed
+                        state[0] = current_time
                         callback()
-
-                        # Start a thread to wait for key release
-                        def wait_for_release():
-                            # Wait until all keys in the combination are released
-                            keys = hotkey.split('+')
-                            while any(keyboard.is_pressed(key) for key in keys):
-                                time.sleep(0.01)
-                            # Reset the pressed state once released
-                            self._hotkey_pressed[hotkey] = False
-                            print(f"[DEBUG] Hotkey '{hotkey}' released and ready for next press")
-
-                        threading.Thread(target=wait_for_release, daemon=True).start()
                     else:
-                        print(f"[DEBUG] Hotkey '{hotkey}' debounced (too soon: {current_time - last_time:.3f}s)")
+                        print(f"[DEBUG] Hotkey '{hotkey}' debounced (too soon: {(current_time - last_time) / 1e9:.3f}s)")
                 else:
                     # Hotkey is being held down - ignore this trigger
                     pass
 
+            # Reset the pressed state once all keys in the combination are released
+            # (the keyboard library updates its pressed-key state before running hooks)
+            def on_key_event(event):
+                if event.event_type == keyboard.KEY_UP and event.scan_code in release_scan_codes \
+                        and state[1] \
+                        and not any(keyboard.is_pressed(code) for code in release_scan_codes):
+                    state[1] = False
+                    print(f"[DEBUG] Hotkey '{hotkey}' released and ready for next press")
+
             # Register the hotkey with the keyboard library using single-trigger wrapper
             keyboard.add_hotkey(hotkey, single_trigger_callback, suppress=False)
+            self._release_hooks[hotkey] = keyboard.hook(on_key_event)
             self.registered_hotkeys.append(hotkey)
             print(f"✓ Registered hotkey: {hotkey} (with {self._debounce_delay}s debounce)")
 
@@ -95,8 +133,12 @@ class HotkeyManager:
         Args:
             hotkey: Hotkey string to unregister
         """
+        if self._kb is None:
+            return  # Nothing was ever registered
+
         try:
-            keyboard.remove_hotkey(hotkey)
+            self._kb.remove_hotkey(hotkey)
+            self._remove_release_hook(hotkey)
             if hotkey in self.registered_hotkeys:
                 self.registered_hotkeys.remove(hotkey)
             print(f"Unregistered hotkey: {hotkey}")
@@ -104,48 +146,101 @@ class HotkeyManager:
         except Exception as e:
             print(f"Error unregistering hotkey '{hotkey}': {e}")
 
+    def _remove_release_hook(self, hotkey: str):
+        """
+        Remove the key release hook registered for a hotkey.
+
+        Args:
+            hotkey: Hotkey string
+        """
+        hook = self._release_hooks.pop(hotkey, None)
+        if hook is not None:
+            try:
+                self._kb.unhook(hook)
+            except Exception:
+                pass
+
     def wait(self):
         """
-        Wait for hotkey events. This blocks until cleanup() is called.
+        Wait for hotkey events. This blocks until stop() or cleanup() is called.
         """
         self.running = True
+        self._interrupted = False
         try:
-            # Keep the program running and listening for hotkeys
-            while self.running:
-                time.sleep(0.1)
+            # Hotkey callbacks run on the keyboard hook thread; this thread just sleeps
+            if self._win_stop_event is not None:
+                self._wait_win32()
+            else:
+                self._stop_event.wait()
+
+            if self._interrupted:
+                raise KeyboardInterrupt
 
         except KeyboardInterrupt:
             print("\nKeyboard interrupt received")
         finally:
             self.running = False
 
+    def _wait_win32(self):
+        """Block in WaitForSingleObject until the stop event is set or Ctrl+C is pressed."""
+        def console_handler(ctrl_type):
+            # CTRL_C_EVENT / CTRL_BREAK_EVENT
+            if ctrl_type in (0, 1):
+                self._interrupted = True
+                self.stop()
+                return True
+            return False
+
+        try:
+            win32api.SetConsoleCtrlHandler(console_handler, True)
+        except Exception:
+            console_handler = None  # No console (GUI build)
+
+        try:
+            win32event.WaitForSingleObject(self._win_stop_event, win32event.INFINITE)
+        finally:
+            if console_handler is not None:
+                try:
+                    win32api.SetConsoleCtrlHandler(console_handler, False)
+                except Exception:
+                    pass
+
     def stop(self):
         """Stop waiting for hotkey events."""
         self.running = False
+        self._stop_event.set()
+        win_stop_event = self._win_stop_event
+        if win_stop_event is not None:
+            win32event.SetEvent(win_stop_event)
 
     def cleanup(self):
         """Cleanup all registered hotkey handlers."""
         try:
-            self.running = False
+            self.stop()
+
+            # Close the stop event handle (stop() skips SetEvent once it is gone)
+            win_stop_event, self._win_stop_event = self._win_stop_event, None
+            if win_stop_event is not None:
+                win32api.CloseHandle(win_stop_event)
+
+            if self._kb is None:
+                return  # keyboard was never imported, so there are no hooks to remove
 
             # Remove all registered hotkeys
             for hotkey in self.registered_hotkeys:
                 try:
-                    keyboard.remove_hotkey(hotkey)
+                    self._kb.remove_hotkey(hotkey)
                 except Exception as e:
                     print(f"Error removing hotkey '{hotkey}': {e}")
 
             # Clear the list
             self.registered_hotkeys.clear()
 
-            # Clear debounce tracking
-            self._last_trigger_time.clear()
-
-            # Clear pressed state tracking
-            self._hotkey_pressed.clear()
+            # Clear release hook tracking (debounce/pressed state lives in the removed callbacks)
+            self._release_hooks.clear()
 
             # Unhook all keyboard hooks
-            keyboard.unhook_all()
+            self._kb.unhook_all()
 
             print("Hotkey manager cleaned up")
 
@@ -159,6 +254,9 @@ class HotkeyManager:
         Returns:
             True if running as admin, False otherwise
         """
+        if sys.platform != 'win32':
+            return False
+
         try:
             import ctypes
             return ctypes.windll.shell32.IsUserAnAdmin() != 0
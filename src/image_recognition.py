@@ -1,42 +1,207 @@
 """Image recognition module for identifying items."""
 
+import os
+import sys
+import hashlib
+import heapq
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple, List
 from PIL import Image
-from src.config import MATCH_THRESHOLD, MATCH_THRESHOLD_LOW, ICON_SIZE
+from src.config import (
+    MATCH_THRESHOLD, MATCH_THRESHOLD_LOW, ICON_SIZE, USE_OPENCL, PHASH_CANDIDATES, PYRAMID_LEVELS, PYRAMID_CANDIDATES,
+    SCORE_WEIGHTS, USE_TEMPLATE_CACHE, ORB_FEATURES
+)
+
+# Bump when the cached template data layout or its preprocessing changes
+TEMPLATE_CACHE_VERSION = 4
+
+
+def _phash(gray: np.ndarray) -> int:
+    """
+    Compute a 64-bit perceptual hash (DCT of a 32x32 downscale, low 8x8 band vs median).
+
+    Args:
+        gray: Grayscale image (uint8)
+
+    Returns:
+        Hash as an unsigned 64-bit integer
+    """
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(small)[:8, :8]
+    bits = np.packbits((low_freq > np.median(low_freq)).ravel())
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+def _pyramid_down(gray: np.ndarray) -> np.ndarray:
+    """
+    Downsample an image to the coarse pyramid level (PYRAMID_LEVELS x cv2.pyrDown).
+
+    Args:
+        gray: Grayscale image (uint8)
+
+    Returns:
+        Coarse grayscale image (uint8)
+    """
+    for _ in range(PYRAMID_LEVELS):
+        gray = cv2.pyrDown(gray)
+    return gray
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise division that yields 0 where the denominator is 0 (flat images)."""
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def _centered_pixels(query: dict) -> Tuple[np.ndarray, float]:
+    """
+    Return the query pixels minus their mean as float32, plus the mean.
+
+    Correlating the templates against the centered query keeps float32 accumulation
+    accurate; sum(T * I) is recovered as sum(T * (I - mean)) + sum(T) * mean.
+    """
+    pixels = query['pixels']
+    mean = query['sum'] / pixels.size
+    return pixels.astype(np.float32) - np.float32(mean), mean
+
+
+def _ncc_batch(template_stack: Optional[np.ndarray], template_stats: np.ndarray, query: dict,
+               dots: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score a query against a stack of templates (TM_CCOEFF_NORMED and TM_CCORR_NORMED).
+
+    The cross-correlation sum(T * I) is one float32 matrix-vector product against the
+    mean-centered query (see _centered_pixels); both scores are then normalized from
+    the precomputed pixel sums:
+        ccoeff = (n * sum(T*I) - sum(T) * sum(I)) / sqrt(var_T * var_I)
+                 with var_X = n * sum(X^2) - sum(X)^2
+        ccorr  = sum(T*I) / sqrt(sum(T^2) * sum(I^2))
+
+    Args:
+        template_stack: (N, H*W) float32 templates (not needed, and may be None, when dots is given)
+        template_stats: (N, 2) int64 [sum, sum of squares] per template
+        query: Query NCC terms (from ItemRecognizer._ncc_terms)
+        dots: Optional precomputed sum(T * I) per template (e.g. from the OpenCL device)
+
+    Returns:
+        Tuple of (ccoeff, ccorr) score arrays, both (N,) float64
+    """
+    n = query['pixels'].size
+    sums, sq_sums = template_stats[:, 0], template_stats[:, 1]
+    if dots is None:
+        centered, mean = _centered_pixels(query)
+        dots = (template_stack @ centered).astype(np.float64) + sums * mean
+
+    numerator = (n * dots - sums * query['sum']).astype(np.float64)
+    variance = (n * sq_sums - sums * sums).astype(np.float64) * query['variance']
+    ccoeff = _safe_divide(numerator, np.sqrt(variance))
+    ccorr = _safe_divide(dots.astype(np.float64), np.sqrt(sq_sums.astype(np.float64) * query['sq_sum']))
+    return ccoeff, ccorr
+
+
+def _hist_correl_batch(hists: np.ndarray, hist_stats: np.ndarray, query_hist: np.ndarray) -> np.ndarray:
+    """
+    Compute cv2.compareHist(..., HISTCMP_CORREL) of a query against a stack of histograms.
+
+    Uses the same sum-based formula as OpenCV, so the scores match compareHist
+    up to floating-point summation order.
+
+    Args:
+        hists: (N, bins) float32 template histograms
+        hist_stats: (N, 2) float64 per-histogram (sum, sum of squares)
+        query_hist: (bins,) float32 query histogram
+
+    Returns:
+        (N,) float64 correlation scores
+    """
+    bins = query_hist.size
+    query_hist = query_hist.astype(np.float64)
+    query_sum = query_hist.sum()
+    query_sq_sum = query_hist @ query_hist
+
+    sums, sq_sums = hist_stats[:, 0], hist_stats[:, 1]
+    numerator = hists.astype(np.float64) @ query_hist - sums * query_sum / bins
+    denominator = (query_sq_sum - query_sum * query_sum / bins) * (sq_sums - sums * sums / bins)
+    # compareHist reports identical flat histograms as fully correlated
+    scores = np.ones(len(hists), dtype=np.float64)
+    valid = np.abs(denominator) > np.finfo(np.float64).eps
+    scores[valid] = numerator[valid] / np.sqrt(denominator[valid])
+    return scores
 
 
 class ItemRecognizer:
     """Recognizes items from captured images using advanced multi-method template matching."""
 
-    def __init__(self, data_dir, database):
+    # Per-template arrays (row i belongs to _template_ids[i]); also the template cache payload
+    _TEMPLATE_ARRAYS = (
+        '_gray_matrix', '_eq_matrix', '_gray_stats', '_eq_stats',
+        '_coarse_gray_matrix', '_coarse_eq_matrix', '_coarse_gray_stats', '_coarse_eq_stats',
+        '_phashes', '_hists', '_hist_stats',
+    )
+
+    def __init__(self, data_dir, database, cache_file: Path = None):
         """
         Initialize the item recognizer.
 
         Args:
             data_dir: Path to the Data directory
             database: ItemDatabase instance
+            cache_file: Path to the preprocessed template cache. Defaults to template_cache.npz next to executable.
         """
         self.data_dir = Path(data_dir)
         self.images_dir = self.data_dir / "Items" / "Images"
         self.database = database
-        self.templates = {}  # item_id -> (template_image, template_gray, template_hist)
+
+        if cache_file is None:
+            # Same location rules as settings.json (works with PyInstaller)
+            if getattr(sys, 'frozen', False):
+                cache_file = Path(sys.executable).parent / "template_cache.npz"
+            else:
+                cache_file = Path(__file__).parent.parent / "template_cache.npz"
+        self.cache_file = Path(cache_file)
+
+        self.templates = {}  # item_id -> dict of precomputed matching data
+        self._allocate_template_arrays(0)  # Contiguous per-template arrays (filled by load_templates)
+        self._float_stacks = {}  # float32 copies of the NCC stacks, built once after loading
+        self._device_stacks = None  # float32 UMat copies of the full-resolution stacks (OpenCL only)
+
+        # Enable OpenCV's transparent API (OpenCL) when requested and supported
+        try:
+            cv2.ocl.setUseOpenCL(USE_OPENCL and cv2.ocl.haveOpenCL())
+            self.use_opencl = cv2.ocl.useOpenCL()
+        except Exception:
+            self.use_opencl = False
+        if self.use_opencl:
+            print("OpenCL acceleration enabled for feature extraction")
 
         # Initialize feature detectors for advanced matching
-        self.orb = cv2.ORB_create(nfeatures=500)
+        # (a method with a 0 weight in SCORE_WEIGHTS skips feature extraction as well as matching)
+        self.orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
+        self.use_orb = SCORE_WEIGHTS['orb_features'] > 0
 
         # Try to initialize SIFT (more accurate than ORB, but requires opencv-contrib-python)
-        try:
-            self.sift = cv2.SIFT_create(nfeatures=500)
-            self.use_sift = True
-            print("SIFT detector initialized successfully")
-        except Exception as e:
-            self.use_sift = False
-            print(f"SIFT not available (requires opencv-contrib-python): {e}")
+        self.use_sift = False
+        if SCORE_WEIGHTS['sift_features'] > 0:
+            try:
+                self.sift = cv2.SIFT_create(nfeatures=500)
+                self.use_sift = True
+                print("SIFT detector initialized successfully")
+            except Exception as e:
+                print(f"SIFT not available (requires opencv-contrib-python): {e}")
 
-        self.template_features = {}  # item_id -> (orb_desc, sift_desc)
+        # Persistent worker pool for per-template scoring (OpenCV releases the GIL)
+        self._workers = max(2, (os.cpu_count() or 2) - 1)
+        # The pool provides the parallelism; OpenCV's own threads would oversubscribe the cores
+        # on these small images
+        cv2.setUseOptimized(True)
+        cv2.setNumThreads(1)
+        self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="recognizer")
+
+    def cleanup(self):
+        """Shut down the scoring worker pool."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
 
     def load_templates(self):
         """Load all item icon templates from the Images directory."""
@@ -47,80 +212,474 @@ class ItemRecognizer:
         # Support both .png and .webp formats
         image_files = list(self.images_dir.glob("*.png")) + list(self.images_dir.glob("*.webp"))
 
-        for image_file in image_files:
+        # Reuse the preprocessed templates from the last run if the icons have not changed
+        fingerprint = self._template_fingerprint(image_files) if USE_TEMPLATE_CACHE else None
+        if fingerprint and self._load_template_cache(fingerprint):
+            print(f"Loaded {len(self.templates)} item icon templates (from cache)")
+            self._build_float_stacks()
+            return
+
+        self._allocate_template_arrays(len(image_files))
+
+        # Decode and preprocess all images on the worker pool (OpenCV releases the GIL)
+        prepared = self._pool.map(self._preprocess_template, image_files)
+
+        for image_file, data in zip(image_files, prepared):
             item_id = image_file.stem  # filename without extension
 
-            try:
-                # Load image - use PIL for .webp files, OpenCV for others
-                if image_file.suffix.lower() == '.webp':
-                    # Use PIL to load WebP files
-                    pil_image = Image.open(str(image_file)).convert('RGB')
-                    # Convert PIL image to OpenCV format (RGB -> BGR)
-                    template = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-                else:
-                    # Use OpenCV for PNG and other formats
-                    template = cv2.imread(str(image_file), cv2.IMREAD_COLOR)
-
-                if template is None:
-                    print(f"Warning: Could not load image {image_file.name}")
-                    continue
-
-                # Resize to standard size if needed
-                if template.shape[:2] != (ICON_SIZE[1], ICON_SIZE[0]):
-                    template = cv2.resize(template, ICON_SIZE)
-
-                # Convert to grayscale for matching
-                template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-
-                # Apply histogram equalization for better lighting normalization
-                template_gray_eq = cv2.equalizeHist(template_gray)
-
-                # Calculate histogram for color-based matching
-                hist = cv2.calcHist([template], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
-                hist = cv2.normalize(hist, hist).flatten()
-
-                # Extract ORB features
-                orb_kp, orb_desc = self.orb.detectAndCompute(template_gray_eq, None)
-
-                # Extract SIFT features if available
-                sift_kp, sift_desc = None, None
-                if self.use_sift:
-                    try:
-                        sift_kp, sift_desc = self.sift.detectAndCompute(template_gray_eq, None)
-                    except Exception:
-                        pass
-
-                # Store all matching data
-                self.templates[item_id] = (template, template_gray, template_gray_eq, hist)
-                if orb_desc is not None or sift_desc is not None:
-                    self.template_features[item_id] = {
-                        'orb': (orb_kp, orb_desc),
-                        'sift': (sift_kp, sift_desc)
-                    }
-
-                loaded_count += 1
+            if isinstance(data, Exception):
+                print(f"Error loading template {image_file.name}: {data}")
+                continue
 
-            except Exception as e:
-                print(f"Error loading template {image_file.name}: {e}")
+            if data is None:
+                print(f"Warning: Could not load image {image_file.name}")
+                continue
+
+            # Fill this template's row of the contiguous arrays (reuse it for duplicate ids)
+            if item_id in self.templates:
+                index = self.templates[item_id]['index']
+            else:
+                index = len(self._template_ids)
+                self._template_ids.append(item_id)
+            self._phashes[index] = data['phash']
+            self._hists[index] = data['hist']
+            self._hist_stats[index] = data['hist_stats']
+            for prefix, terms in data['ncc_terms'].items():
+                getattr(self, prefix + '_matrix')[index] = terms['pixels']
+                getattr(self, prefix + '_stats')[index] = (terms['sum'], terms['sq_sum'])
+
+            # Store the remaining per-template matching data
+            self.templates[item_id] = {
+                'index': index,
+                'orb': data['orb'],
+                'sift': data['sift'],
+            }
 
+            loaded_count += 1
+
+        self._trim_template_arrays(len(self._template_ids))
         print(f"Loaded {loaded_count} item icon templates")
+        self._build_float_stacks()
+
+        if fingerprint:
+            self._save_template_cache(fingerprint)
+
+    def _template_fingerprint(self, image_files: List[Path]) -> Optional[str]:
+        """
+        Hash the icon files and the preprocessing settings that the cache depends on.
+
+        File contents are hashed rather than mtimes, because PyInstaller re-extracts
+        the Data folder with fresh timestamps on every launch.
+
+        Args:
+            image_files: Template image paths
+
+        Returns:
+            Hex digest, or None if the files could not be read
+        """
+        digest = hashlib.sha1(
+            f"{TEMPLATE_CACHE_VERSION}|{ICON_SIZE}|{PYRAMID_LEVELS}|{self.use_opencl}|{self.use_orb}|{self.use_sift}|"
+            f"{self.orb.getMaxFeatures()}".encode())
+        try:
+            for image_file in sorted(image_files):
+                digest.update(image_file.name.encode('utf-8'))
+                digest.update(image_file.read_bytes())
+        except OSError as e:
+            print(f"Warning: Could not fingerprint templates: {e}")
+            return None
+        return digest.hexdigest()
+
+    def _load_template_cache(self, fingerprint: str) -> bool:
+        """
+        Restore preprocessed templates from the cache file.
+
+        Args:
+            fingerprint: Expected fingerprint of the current icon set
+
+        Returns:
+            True if the cache was valid and loaded, False otherwise
+        """
+        if not self.cache_file.exists():
+            return False
+
+        def split_descriptors(block, counts):
+            parts = np.split(block, np.cumsum(counts)[:-1])
+            return [part if len(part) else None for part in parts]
+
+        # Read and validate everything before touching self, so a truncated or
+        # old-format cache falls back to a rebuild instead of failing startup
+        try:
+            with np.load(self.cache_file, allow_pickle=False) as cache:
+                if str(cache['fingerprint']) != fingerprint:
+                    return False
+                data = {key: cache[key] for key in cache.files}
+
+            ids = [str(item_id) for item_id in data['ids']]
+            arrays = {name: data[name.lstrip('_')] for name in self._TEMPLATE_ARRAYS}
+            orb_descs = split_descriptors(data['orb_desc'], data['orb_counts'])
+            sift_descs = split_descriptors(data['sift_desc'], data['sift_counts'])
+            if any(len(values) != len(ids) for values in (*arrays.values(), orb_descs, sift_descs)):
+                raise ValueError("array lengths do not match the template ids")
+        except Exception as e:
+            print(f"Warning: Could not read template cache: {e}")
+            return False
+
+        self._template_ids = ids
+        for name, values in arrays.items():
+            setattr(self, name, values)
+
+        self.templates = {
+            item_id: {
+                'index': index,
+                'orb': orb_descs[index],
+                'sift': sift_descs[index],
+            }
+            for index, item_id in enumerate(ids)
+        }
+        return True
+
+    def _save_template_cache(self, fingerprint: str):
+        """
+        Write the preprocessed templates to the cache file.
+
+        Descriptors of all templates are stored as one concatenated block per
+        detector plus per-template row counts.
+
+        Args:
+            fingerprint: Fingerprint of the icon set the templates were built from
+        """
+        templates = [self.templates[item_id] for item_id in self._template_ids]
+
+        def join_descriptors(key, width, dtype):
+            descs = [t[key] for t in templates]
+            counts = np.array([0 if d is None else len(d) for d in descs], dtype=np.int32)
+            present = [d for d in descs if d is not None and len(d)]
+            block = np.concatenate(present) if present else np.empty((0, width), dtype=dtype)
+            return block, counts
+
+        orb_desc, orb_counts = join_descriptors('orb', 32, np.uint8)
+        sift_desc, sift_counts = join_descriptors('sift', 128, np.float32)
+
+        tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        try:
+            with open(tmp_file, 'wb') as f:
+                np.savez(
+                    f,
+                    fingerprint=np.array(fingerprint),
+                    ids=np.array(self._template_ids),
+                    orb_desc=orb_desc,
+                    orb_counts=orb_counts,
+                    sift_desc=sift_desc,
+                    sift_counts=sift_counts,
+                    **{name.lstrip('_'): getattr(self, name) for name in self._TEMPLATE_ARRAYS},
+                )
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"Warning: Could not write template cache: {e}")
+
+    def _preprocess_template(self, image_file: Path):
+        """
+        Decode one template image and compute its matching data (runs in a worker thread).
+
+        Args:
+            image_file: Path to a .png or .webp icon
+
+        Returns:
+            Dict of per-template data, None if the image could not be decoded, or the raised exception
+        """
+        template = self._read_template(image_file)
+        if template is None or isinstance(template, Exception):
+            return template
+
+        try:
+            # Resize to standard size if needed
+            if template.shape[:2] != (ICON_SIZE[1], ICON_SIZE[0]):
+                template = cv2.resize(template, ICON_SIZE)
+
+            # Convert to grayscale for matching
+            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+
+            # Apply histogram equalization for better lighting normalization
+            template_gray_eq = cv2.equalizeHist(template_gray)
+
+            # Calculate histogram for color-based matching
+            hist = cv2.calcHist([template], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
+            hist = cv2.normalize(hist, hist).flatten()
+            hist64 = hist.astype(np.float64)
+
+            # Extract ORB features (only the descriptors are kept; one row per keypoint)
+            orb_desc = None
+            if self.use_orb:
+                _, orb_desc = self._detect_features(self.orb, template_gray_eq)
+
+            # Extract SIFT features if available
+            sift_desc = None
+            if self.use_sift:
+                try:
+                    _, sift_desc = self._detect_features(self.sift, template_gray_eq)
+                except Exception:
+                    pass
+
+            return {
+                'phash': _phash(template_gray),
+                'hist': hist,
+                'hist_stats': (hist64.sum(), hist64 @ hist64),
+                # Pixels and pixel sums so per-query matching reduces to inner products
+                # (full resolution, plus the coarse pyramid level for the cheap candidate pass)
+                'ncc_terms': {
+                    '_gray': self._ncc_terms(template_gray),
+                    '_eq': self._ncc_terms(template_gray_eq),
+                    '_coarse_gray': self._ncc_terms(_pyramid_down(template_gray)),
+                    '_coarse_eq': self._ncc_terms(_pyramid_down(template_gray_eq)),
+                },
+                'orb': orb_desc,
+                'sift': sift_desc,
+            }
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _read_template(image_file: Path):
+        """
+        Decode one template image as BGR (runs in a worker thread).
+
+        Args:
+            image_file: Path to a .png or .webp icon
+
+        Returns:
+            BGR image, None if OpenCV could not decode it, or the raised exception
+        """
+        try:
+            # Load image - use PIL for .webp files, OpenCV for others
+            if image_file.suffix.lower() == '.webp':
+                # Use PIL to load WebP files
+                pil_image = Image.open(str(image_file)).convert('RGB')
+                # Convert PIL image to OpenCV format (RGB -> BGR)
+                return cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+            # Use OpenCV for PNG and other formats
+            return cv2.imread(str(image_file), cv2.IMREAD_COLOR)
+        except Exception as e:
+            return e
+
+    def _allocate_template_arrays(self, count: int):
+        """
+        Allocate the structure-of-arrays template storage for up to count templates.
+
+        Row i of every array belongs to self._template_ids[i]. The grayscale and
+        equalized templates are kept as flat uint8 rows, so correlations for a set
+        of templates are computed with one matrix-vector product per image variant.
+
+        Args:
+            count: Maximum number of templates that will be stored
+        """
+        vector_size = ICON_SIZE[0] * ICON_SIZE[1]
+        coarse_size = _pyramid_down(np.zeros((ICON_SIZE[1], ICON_SIZE[0]), dtype=np.uint8)).size
+        self._template_ids = []
+        self._gray_matrix = np.empty((count, vector_size), dtype=np.uint8)
+        self._eq_matrix = np.empty((count, vector_size), dtype=np.uint8)
+        self._gray_stats = np.empty((count, 2), dtype=np.int64)
+        self._eq_stats = np.empty((count, 2), dtype=np.int64)
+        self._coarse_gray_matrix = np.empty((count, coarse_size), dtype=np.uint8)
+        self._coarse_eq_matrix = np.empty((count, coarse_size), dtype=np.uint8)
+        self._coarse_gray_stats = np.empty((count, 2), dtype=np.int64)
+        self._coarse_eq_stats = np.empty((count, 2), dtype=np.int64)
+        self._phashes = np.zeros(count, dtype=np.uint64)
+        self._hists = np.empty((count, 512), dtype=np.float32)  # 8x8x8 BGR color histograms
+        self._hist_stats = np.empty((count, 2), dtype=np.float64)
+
+    def _trim_template_arrays(self, count: int):
+        """
+        Drop unused trailing rows (files that failed to load or duplicate ids).
+
+        Args:
+            count: Number of templates actually stored
+        """
+        for name in self._TEMPLATE_ARRAYS:
+            setattr(self, name, getattr(self, name)[:count])
+
+    def _build_float_stacks(self):
+        """
+        Convert the uint8 NCC stacks to float32 once, so every query is a plain BLAS product.
+
+        The full-resolution stacks are also uploaded to the OpenCL device when it is enabled.
+        """
+        self._float_stacks = {
+            prefix: getattr(self, f'_{prefix}_matrix').astype(np.float32)
+            for prefix in ('gray', 'eq', 'coarse_gray', 'coarse_eq')
+        }
+        self._device_stacks = None
+        if not self.use_opencl or not self._template_ids:
+            return
+        try:
+            self._device_stacks = {
+                'gray': cv2.UMat(self._float_stacks['gray']),
+                'eq': cv2.UMat(self._float_stacks['eq']),
+            }
+        except Exception as e:
+            print(f"Warning: Could not upload templates to the OpenCL device: {e}")
+
+    def _device_dots(self, name: str, terms: dict) -> np.ndarray:
+        """
+        Compute sum(T * I) for every template with one GEMM on the OpenCL device.
+
+        The product is taken against the mean-centered query (which keeps float32
+        accumulation accurate) and shifted back by sum(T) * mean(I) on the host.
 
-    def _calculate_match_score(self, image_gray, image_gray_eq, image_hist,
-                                template_gray, template_gray_eq, template_hist,
-                                item_id, orb_features=None, sift_features=None) -> Tuple[float, dict]:
+        Args:
+            name: Stack name ('gray' or 'eq')
+            terms: Query NCC terms (from _ncc_terms)
+
+        Returns:
+            (N,) float64 correlation sums indexed like _template_ids
+        """
+        centered, mean = _centered_pixels(terms)
+        product = cv2.gemm(self._device_stacks[name], cv2.UMat(centered.reshape(-1, 1)), 1.0, None, 0.0)
+        centered_dots = product.get().ravel().astype(np.float64)
+        sums = getattr(self, f'_{name}_stats')[:, 0]
+        return centered_dots + sums * mean
+
+    def _batch_ncc(self, query: dict, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute the normalized correlation scores of a query against a set of templates at once.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+            indices: Template indices to score
+
+        Returns:
+            Tuple of (ccoeff, ccorr, equalized ccoeff) score arrays aligned with indices
+        """
+        # The device GEMM covers every template, so it runs once per query and is reused
+        # by every later scoring pass (e.g. the full-scan fallback)
+        device_dots = query.get('device_dots')
+        if device_dots is None and self._device_stacks is not None:
+            try:
+                device_dots = {name: self._device_dots(name, query[name]) for name in ('gray', 'eq')}
+                query['device_dots'] = device_dots
+            except Exception as e:
+                print(f"Warning: OpenCL correlation failed, using CPU: {e}")
+                self._device_stacks = None
+
+        if device_dots is not None:
+            ccoeff, ccorr = _ncc_batch(None, self._gray_stats[indices], query['gray'], device_dots['gray'][indices])
+            equalized, _ = _ncc_batch(None, self._eq_stats[indices], query['eq'], device_dots['eq'][indices])
+        else:
+            stacks = self._float_stacks
+            ccoeff, ccorr = _ncc_batch(stacks['gray'][indices], self._gray_stats[indices], query['gray'])
+            equalized, _ = _ncc_batch(stacks['eq'][indices], self._eq_stats[indices], query['eq'])
+
+        return ccoeff, ccorr, equalized
+
+    def _batch_scores(self, query: dict, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute every per-template score that does not need feature matching, for a set of templates at once.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+            indices: Template indices to score
+
+        Returns:
+            Tuple of (ccoeff, ccorr, equalized ccoeff, histogram) score arrays aligned with indices
+        """
+        ccoeff, ccorr, equalized = self._batch_ncc(query, indices)
+        histogram = _hist_correl_batch(self._hists[indices], self._hist_stats[indices], query['hist'])
+        return ccoeff, ccorr, equalized, histogram
+
+    @staticmethod
+    def _ncc_terms(gray: np.ndarray) -> dict:
+        """
+        Precompute the normalized cross-correlation terms of a grayscale image.
+
+        Image and template are always resized to ICON_SIZE, so TM_CCOEFF_NORMED and
+        TM_CCORR_NORMED have a single output position and reduce to an inner product
+        plus the pixel sums (see _ncc_batch).
+
+        Args:
+            gray: Grayscale image (uint8)
+
+        Returns:
+            Dict with flat uint8 pixels, pixel sum, sum of squares and n * variance
+        """
+        pixels = np.ascontiguousarray(gray).ravel()
+        wide = pixels.astype(np.int64)
+        total = int(wide.sum())
+        sq_sum = int(np.dot(wide, wide))
+        return {
+            'pixels': pixels,
+            'sum': total,
+            'sq_sum': sq_sum,
+            'variance': pixels.size * sq_sum - total * total,
+        }
+
+    def _detect_features(self, detector, gray: np.ndarray) -> tuple:
+        """
+        Run keypoint detection and description, on the OpenCL device when enabled.
+
+        Args:
+            detector: OpenCV feature detector (ORB or SIFT)
+            gray: Grayscale image (uint8)
+
+        Returns:
+            Tuple of (keypoints, descriptors) with descriptors as a numpy array (or None)
+        """
+        if self.use_opencl:
+            keypoints, descriptors = detector.detectAndCompute(cv2.UMat(gray), None)
+            if isinstance(descriptors, cv2.UMat):
+                descriptors = descriptors.get()
+            return keypoints, descriptors
+        return detector.detectAndCompute(gray, None)
+
+    def _prepare_image(self, image: np.ndarray) -> dict:
+        """
+        Preprocess a captured image once so it can be compared against every template.
+
+        Args:
+            image: The captured image (BGR format)
+
+        Returns:
+            Dict with the query-side data used by _calculate_match_score
+        """
+        # Remove white background if present
+        image = self._remove_white_background(image)
+
+        # Resize captured image to standard size if needed
+        if image.shape[:2] != (ICON_SIZE[1], ICON_SIZE[0]):
+            image = cv2.resize(image, ICON_SIZE)
+
+        image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        image_gray_eq = cv2.equalizeHist(image_gray)
+        image_hist = cv2.calcHist([image], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
+        image_hist = cv2.normalize(image_hist, image_hist).flatten()
+
+        # Pre-compute features once for all comparisons
+        orb_features = self._detect_features(self.orb, image_gray_eq) if self.use_orb else None
+        sift_features = None
+        if self.use_sift:
+            try:
+                sift_features = self._detect_features(self.sift, image_gray_eq)
+            except Exception:
+                pass
+
+        return {
+            'hist': image_hist,
+            'phash': _phash(image_gray),
+            'gray': self._ncc_terms(image_gray),
+            'eq': self._ncc_terms(image_gray_eq),
+            'coarse_gray': self._ncc_terms(_pyramid_down(image_gray)),
+            'coarse_eq': self._ncc_terms(_pyramid_down(image_gray_eq)),
+            'orb': orb_features,
+            'sift': sift_features,
+        }
+
+    def _calculate_match_score(self, query: dict, template: dict,
+                               batch_scores: Tuple[float, float, float, float]) -> Tuple[float, dict]:
         """
         Calculate comprehensive match score using multiple methods.
 
         Args:
-            image_gray: Grayscale input image
-            image_gray_eq: Histogram-equalized grayscale input
-            image_hist: Color histogram of input
-            template_gray: Grayscale template
-            template_gray_eq: Histogram-equalized template
-            template_hist: Color histogram of template
-            item_id: Template item ID for feature matching
-            orb_features: Pre-computed ORB features for input image (optional)
-            sift_features: Pre-computed SIFT features for input image (optional)
+            query: Preprocessed captured image (from _prepare_image)
+            template: Precomputed template data (from load_templates)
+            batch_scores: (ccoeff, ccorr, equalized ccoeff, histogram) for this template (from _batch_scores)
 
         Returns:
             Tuple of (combined match score, detailed scores dict)
@@ -129,46 +688,40 @@ class ItemRecognizer:
         weights = []
         score_details = {}
 
+        score1, score2, score3, hist_score = batch_scores
+
         # 1. Quick histogram pre-filter to skip obviously wrong matches
-        hist_score = cv2.compareHist(image_hist, template_hist, cv2.HISTCMP_CORREL)
         score_details['histogram'] = hist_score
 
         # If histogram similarity is too low, skip expensive computations
         if hist_score < 0.3:
             return 0.0, score_details
 
-        # 2. Template matching with normalized correlation
-        result = cv2.matchTemplate(image_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-        _, score1, _, _ = cv2.minMaxLoc(result)
+        # 2. Template matching with normalized correlation (TM_CCOEFF_NORMED)
         scores.append(score1)
-        weights.append(0.20)
+        weights.append(SCORE_WEIGHTS['template_ccoeff'])
         score_details['template_ccoeff'] = score1
 
-        # 3. Template matching with correlation coefficient
-        result = cv2.matchTemplate(image_gray, template_gray, cv2.TM_CCORR_NORMED)
-        _, score2, _, _ = cv2.minMaxLoc(result)
+        # 3. Template matching with correlation coefficient (TM_CCORR_NORMED)
         scores.append(score2)
-        weights.append(0.10)
+        weights.append(SCORE_WEIGHTS['template_ccorr'])
         score_details['template_ccorr'] = score2
 
         # 4. Template matching on equalized images (lighting invariant)
-        result = cv2.matchTemplate(image_gray_eq, template_gray_eq, cv2.TM_CCOEFF_NORMED)
-        _, score3, _, _ = cv2.minMaxLoc(result)
         scores.append(score3)
-        weights.append(0.25)
+        weights.append(SCORE_WEIGHTS['template_equalized'])
         score_details['template_equalized'] = score3
 
         # 5. Histogram comparison (already computed)
         scores.append(hist_score)
-        weights.append(0.15)
+        weights.append(SCORE_WEIGHTS['histogram'])
 
         # 6. ORB feature matching
         orb_score = 0.0
-        if item_id in self.template_features and orb_features is not None:
+        if SCORE_WEIGHTS['orb_features'] > 0 and query['orb'] is not None:
             try:
-                kp_img, desc_img = orb_features
-                template_features = self.template_features[item_id]
-                kp_tpl, desc_tpl = template_features['orb']
+                kp_img, desc_img = query['orb']
+                desc_tpl = template['orb']
 
                 if desc_img is not None and desc_tpl is not None and len(desc_img) > 0:
                     bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
@@ -177,21 +730,20 @@ class ItemRecognizer:
                     if len(matches) > 0:
                         matches = sorted(matches, key=lambda x: x.distance)
                         good_matches = [m for m in matches if m.distance < 50]
-                        orb_score = min(1.0, len(good_matches) / max(10, len(kp_tpl) * 0.3))
+                        orb_score = min(1.0, len(good_matches) / max(10, len(desc_tpl) * 0.3))
             except Exception:
                 pass
 
         scores.append(orb_score)
-        weights.append(0.15)
+        weights.append(SCORE_WEIGHTS['orb_features'])
         score_details['orb_features'] = orb_score
 
         # 7. SIFT feature matching (more accurate than ORB)
         sift_score = 0.0
-        if self.use_sift and item_id in self.template_features and sift_features is not None:
+        if SCORE_WEIGHTS['sift_features'] > 0 and self.use_sift and query['sift'] is not None:
             try:
-                kp_img, desc_img = sift_features
-                template_features = self.template_features[item_id]
-                kp_tpl, desc_tpl = template_features['sift']
+                kp_img, desc_img = query['sift']
+                desc_tpl = template['sift']
 
                 if desc_img is not None and desc_tpl is not None and len(desc_img) > 0:
                     bf = cv2.BFMatcher(cv2.NORM_L2, crossCheck=True)
@@ -201,12 +753,12 @@ class ItemRecognizer:
                         matches = sorted(matches, key=lambda x: x.distance)
                         # SIFT uses different distance metric
                         good_matches = [m for m in matches if m.distance < 200]
-                        sift_score = min(1.0, len(good_matches) / max(10, len(kp_tpl) * 0.3))
+                        sift_score = min(1.0, len(good_matches) / max(10, len(desc_tpl) * 0.3))
             except Exception:
                 pass
 
         scores.append(sift_score)
-        weights.append(0.15)
+        weights.append(SCORE_WEIGHTS['sift_features'])
         score_details['sift_features'] = sift_score
 
         # Calculate weighted average
@@ -219,6 +771,225 @@ class ItemRecognizer:
         score_details['final'] = final_score
         return max(0.0, min(1.0, final_score)), score_details
 
+    def _phash_candidates(self, query: dict) -> np.ndarray:
+        """
+        Select the templates closest to the query by perceptual-hash Hamming distance.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+
+        Returns:
+            Sorted template indices of the PHASH_CANDIDATES nearest templates
+        """
+        count = len(self._template_ids)
+        if PHASH_CANDIDATES <= 0 or count <= PHASH_CANDIDATES:
+            return np.arange(count)
+
+        xor = self._phashes ^ np.uint64(query['phash'])
+        distances = np.unpackbits(xor.view(np.uint8).reshape(count, 8), axis=1).sum(axis=1)
+        return np.sort(np.argpartition(distances, PHASH_CANDIDATES)[:PHASH_CANDIDATES])
+
+    def _pyramid_candidates(self, query: dict) -> np.ndarray:
+        """
+        Select the templates with the best correlation at the coarse pyramid level.
+
+        The coarse pass correlates images downsampled PYRAMID_LEVELS times, blending
+        gray and equalized CCOEFF with the same weights as the full-resolution scores.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+
+        Returns:
+            Sorted template indices of the PYRAMID_CANDIDATES best coarse matches
+        """
+        count = len(self._template_ids)
+        if PYRAMID_CANDIDATES <= 0:
+            return np.empty(0, dtype=np.intp)
+        if count <= PYRAMID_CANDIDATES:
+            return np.arange(count)
+
+        stacks = self._float_stacks
+        coarse_gray, _ = _ncc_batch(stacks['coarse_gray'], self._coarse_gray_stats, query['coarse_gray'])
+        coarse_eq, _ = _ncc_batch(stacks['coarse_eq'], self._coarse_eq_stats, query['coarse_eq'])
+        coarse_scores = (SCORE_WEIGHTS['template_ccoeff'] * coarse_gray
+                         + SCORE_WEIGHTS['template_equalized'] * coarse_eq)
+        return np.sort(np.argpartition(-coarse_scores, PYRAMID_CANDIDATES)[:PYRAMID_CANDIDATES])
+
+    def _score_chunk(self, query: dict, indices, batch_scores, cancel_event=None) -> Optional[List[Tuple[int, float, dict]]]:
+        """
+        Run the full multi-method scoring for one chunk of template indices.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+            indices: Template indices to score
+            batch_scores: Score arrays from _batch_scores, aligned with indices
+            cancel_event: Event to signal cancellation
+
+        Returns:
+            List of (template index, score, details), or None if cancelled
+        """
+        results = []
+        for index, ccoeff, ccorr, equalized, histogram in zip(indices, *batch_scores):
+            if cancel_event is not None and getattr(cancel_event, 'is_set', lambda: False)():
+                return None
+
+            template = self.templates[self._template_ids[index]]
+            score, details = self._calculate_match_score(query, template, (
+                float(ccoeff), float(ccorr), float(equalized), float(histogram)))
+            results.append((int(index), score, details))
+        return results
+
+    def _score_bounds(self, query: dict, indices: np.ndarray, batch_scores) -> np.ndarray:
+        """
+        Upper bound of _calculate_match_score for each template.
+
+        The NCC and histogram terms are exact and the ORB/SIFT terms are taken at
+        their maximum of 1.0. The terms are summed in the same order as in
+        _calculate_match_score, so floating-point rounding cannot push a real
+        score above its bound.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+            indices: Template indices
+            batch_scores: Score arrays from _batch_scores, aligned with indices
+
+        Returns:
+            Array of score upper bounds aligned with indices
+        """
+        orb_max = 1.0 if SCORE_WEIGHTS['orb_features'] > 0 and query['orb'] is not None else 0.0
+        sift_max = 1.0 if SCORE_WEIGHTS['sift_features'] > 0 and self.use_sift and query['sift'] is not None else 0.0
+
+        ccoeff, ccorr, equalized, hist_scores = batch_scores
+        total = (ccoeff * SCORE_WEIGHTS['template_ccoeff']
+                 + ccorr * SCORE_WEIGHTS['template_ccorr']
+                 + equalized * SCORE_WEIGHTS['template_equalized']
+                 + hist_scores * SCORE_WEIGHTS['histogram']
+                 + orb_max * SCORE_WEIGHTS['orb_features']
+                 + sift_max * SCORE_WEIGHTS['sift_features'])
+        total_weight = sum(SCORE_WEIGHTS.values())
+        bounds = total / total_weight if total_weight > 0 else np.zeros(len(indices))
+        # Final scores are clamped at 0, and templates failing the histogram pre-filter score exactly 0
+        bounds = np.maximum(bounds, 0.0)
+        bounds[hist_scores < 0.3] = 0.0
+        return bounds
+
+    def _score_chunks(self, query: dict, indices: np.ndarray, batch_scores, cancel_event=None) -> Optional[List[Tuple[int, float, dict]]]:
+        """
+        Score template indices in parallel chunks on the worker pool.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+            indices: Array of template indices to score
+            batch_scores: Score arrays from _batch_scores, aligned with indices
+            cancel_event: Event to signal cancellation
+
+        Returns:
+            List of (template index, score, details) in the order of indices, or None if cancelled
+        """
+        chunks = [chunk for chunk in np.array_split(np.arange(len(indices)), self._workers) if len(chunk)]
+        futures = [self._pool.submit(self._score_chunk, query, indices[chunk],
+                                     tuple(scores[chunk] for scores in batch_scores), cancel_event)
+                   for chunk in chunks]
+
+        results = []
+        for future in futures:
+            chunk_results = future.result()
+            if chunk_results is None:
+                return None
+            results.extend(chunk_results)
+        return results
+
+    def _score_templates(self, query: dict, indices: np.ndarray, cancel_event=None,
+                         best_score: Optional[float] = None, keep: int = 1) -> Optional[List[Tuple[int, float, dict]]]:
+        """
+        Score template indices on the worker pool.
+
+        With best_score, templates are scored in waves by descending score upper
+        bound (see _score_bounds), and templates whose bound falls below the
+        keep-th best score found so far are skipped. Skipped templates can never
+        beat (or tie) any of the keep best matches, so those are the same as with
+        a full scan.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+            indices: Array of template indices to score
+            cancel_event: Event to signal cancellation
+            best_score: Best score already found elsewhere; None scores every template
+            keep: Number of best matches that must be exact (e.g. top N)
+
+        Returns:
+            List of (template index, score, details) in index order, or None if cancelled
+        """
+        if best_score is not None and keep <= 0:
+            return []  # No match has to be exact, so every template can be skipped
+        batch_scores = self._batch_scores(query, indices)
+        if best_score is None:
+            return self._score_chunks(query, indices, batch_scores, cancel_event)
+
+        bounds = self._score_bounds(query, indices, batch_scores)
+        order = np.argsort(-bounds, kind='stable')
+        wave_size = 4 * self._workers
+        results = []
+        top_scores = []  # Min-heap of the keep best scores so far
+        for start in range(0, len(order), wave_size):
+            wave = order[start:start + wave_size]
+            # Margin keeps templates whose bound only ties the best score
+            wave = wave[bounds[wave] + 1e-9 >= best_score]
+            if not len(wave):
+                break  # Bounds are sorted, so no later template can win either
+            wave_results = self._score_chunks(query, indices[wave],
+                                              tuple(scores[wave] for scores in batch_scores), cancel_event)
+            if wave_results is None:
+                return None
+            results.extend(wave_results)
+            for _, score, _ in wave_results:
+                if len(top_scores) < keep:
+                    heapq.heappush(top_scores, score)
+                elif score > top_scores[0]:
+                    heapq.heapreplace(top_scores, score)
+            if len(top_scores) == keep:
+                best_score = max(best_score, top_scores[0])
+        return sorted(results, key=lambda r: r[0])
+
+    def _find_best_match(self, query: dict, cancel_event=None) -> Optional[Tuple[Optional[str], float, dict]]:
+        """
+        Find the best scoring template for a query.
+
+        Only the perceptual-hash candidates and the best coarse pyramid matches are
+        fully scored first; the remaining templates are scored as well when no
+        candidate reaches MATCH_THRESHOLD. Both passes skip templates whose score
+        bound cannot beat the best match so far.
+
+        Args:
+            query: Preprocessed captured image (from _prepare_image)
+            cancel_event: Event to signal cancellation
+
+        Returns:
+            Tuple of (item_id or None, score, details), or None if cancelled
+        """
+        candidates = np.union1d(self._phash_candidates(query), self._pyramid_candidates(query))
+        results = self._score_templates(query, candidates, cancel_event, best_score=0.0)
+        if results is None:
+            return None
+
+        candidate_best = max((score for _, score, _ in results), default=0.0)
+        if candidate_best < MATCH_THRESHOLD and len(candidates) < len(self._template_ids):
+            remaining = np.setdiff1d(np.arange(len(self._template_ids)), candidates)
+            rest = self._score_templates(query, remaining, cancel_event, best_score=candidate_best)
+            if rest is None:
+                return None
+            results = sorted(results + rest, key=lambda r: r[0])
+
+        best_match_id = None
+        best_match_score = 0.0
+        best_score_details = {}
+        for index, score, details in results:
+            if score > best_match_score:
+                best_match_score = score
+                best_match_id = self._template_ids[index]
+                best_score_details = details
+        return best_match_id, best_match_score, best_score_details
+
     def _remove_white_background(self, image: np.ndarray) -> np.ndarray:
         """
         Remove white/light border from captured screenshot by cropping to content.
@@ -240,20 +1011,13 @@ class ItemRecognizer:
 
             # Check if edges are light (white/light gray background)
             # Sample pixels from all 4 edges (use larger sample area)
+            # (cv2.sumElems / size gives the same mean as np.mean at a fraction of the call overhead)
             edge_width = 5
-            top_edge = np.mean(gray[0:edge_width, :])
-            bottom_edge = np.mean(gray[-edge_width:, :])
-            left_edge = np.mean(gray[:, 0:edge_width])
-            right_edge = np.mean(gray[:, -edge_width:])
+            edges = (gray[0:edge_width, :], gray[-edge_width:, :], gray[:, 0:edge_width], gray[:, -edge_width:])
 
             # Lower threshold to catch light gray backgrounds (>200 instead of >230)
             light_threshold = 200
-            light_edges = sum([
-                top_edge > light_threshold,
-                bottom_edge > light_threshold,
-                left_edge > light_threshold,
-                right_edge > light_threshold
-            ])
+            light_edges = sum(cv2.sumElems(edge)[0] / edge.size > light_threshold for edge in edges)
 
             # If less than 2 edges are light, no white background detected
             if light_edges < 2:
@@ -327,45 +1091,14 @@ class ItemRecognizer:
             return None
 
         try:
-            # Remove white background if present
-            image = self._remove_white_background(image)
-
-            # Resize captured image to standard size if needed
-            if image.shape[:2] != (ICON_SIZE[1], ICON_SIZE[0]):
-                image = cv2.resize(image, ICON_SIZE)
-
             # Prepare image for matching (computed once)
-            image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            image_gray_eq = cv2.equalizeHist(image_gray)
-            image_hist = cv2.calcHist([image], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
-            image_hist = cv2.normalize(image_hist, image_hist).flatten()
-
-            # Pre-compute features once for all comparisons
-            orb_features = self.orb.detectAndCompute(image_gray_eq, None)
-            sift_features = None
-            if self.use_sift:
-                try:
-                    sift_features = self.sift.detectAndCompute(image_gray_eq, None)
-                except Exception:
-                    pass
-
-            best_match_id = None
-            best_match_score = 0.0
-
-            # Compare against all templates using comprehensive scoring
-            for item_id, (template, template_gray, template_gray_eq, template_hist) in self.templates.items():
-                if cancel_event is not None and getattr(cancel_event, 'is_set', lambda: False)():
-                    return None
-
-                score, _ = self._calculate_match_score(
-                    image_gray, image_gray_eq, image_hist,
-                    template_gray, template_gray_eq, template_hist,
-                    item_id, orb_features, sift_features
-                )
+            query = self._prepare_image(image)
 
-                if score > best_match_score:
-                    best_match_score = score
-                    best_match_id = item_id
+            # Compare against templates using comprehensive scoring
+            best = self._find_best_match(query, cancel_event)
+            if best is None:
+                return None
+            best_match_id, best_match_score, _ = best
 
             # Return match if above threshold
             if best_match_score >= MATCH_THRESHOLD:
@@ -397,47 +1130,14 @@ class ItemRecognizer:
             return None
 
         try:
-            # Remove white background if present
-            image = self._remove_white_background(image)
-
-            # Resize captured image to standard size if needed
-            if image.shape[:2] != (ICON_SIZE[1], ICON_SIZE[0]):
-                image = cv2.resize(image, ICON_SIZE)
-
             # Prepare image for matching (computed once)
-            image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            image_gray_eq = cv2.equalizeHist(image_gray)
-            image_hist = cv2.calcHist([image], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
-            image_hist = cv2.normalize(image_hist, image_hist).flatten()
-
-            # Pre-compute features once
-            orb_features = self.orb.detectAndCompute(image_gray_eq, None)
-            sift_features = None
-            if self.use_sift:
-                try:
-                    sift_features = self.sift.detectAndCompute(image_gray_eq, None)
-                except Exception:
-                    pass
-
-            best_match_id = None
-            best_match_score = 0.0
-            best_score_details = {}
+            query = self._prepare_image(image)
 
-            # Compare against all templates
-            for item_id, (template, template_gray, template_gray_eq, template_hist) in self.templates.items():
-                if cancel_event is not None and getattr(cancel_event, 'is_set', lambda: False)():
-                    return None
-
-                score, details = self._calculate_match_score(
-                    image_gray, image_gray_eq, image_hist,
-                    template_gray, template_gray_eq, template_hist,
-                    item_id, orb_features, sift_features
-                )
-
-                if score > best_match_score:
-                    best_match_score = score
-                    best_match_id = item_id
-                    best_score_details = details
+            # Compare against templates
+            best = self._find_best_match(query, cancel_event)
+            if best is None:
+                return None
+            best_match_id, best_match_score, best_score_details = best
 
             # Return match if above threshold
             if best_match_score >= MATCH_THRESHOLD and best_match_id:
@@ -463,52 +1163,25 @@ class ItemRecognizer:
         Returns:
             List of tuples [(item_id, confidence_score, score_details), ...] sorted by score
         """
-        if image is None or len(self.templates) == 0:
+        if image is None or len(self.templates) == 0 or top_n <= 0:
             return []
 
         try:
-            # Remove white background if present
-            image = self._remove_white_background(image)
-
-            # Resize captured image to standard size if needed
-            if image.shape[:2] != (ICON_SIZE[1], ICON_SIZE[0]):
-                image = cv2.resize(image, ICON_SIZE)
-
             # Prepare image for matching (computed once)
-            image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            image_gray_eq = cv2.equalizeHist(image_gray)
-            image_hist = cv2.calcHist([image], [0, 1, 2], None, [8, 8, 8], [0, 256, 0, 256, 0, 256])
-            image_hist = cv2.normalize(image_hist, image_hist).flatten()
-
-            # Pre-compute features once
-            orb_features = self.orb.detectAndCompute(image_gray_eq, None)
-            sift_features = None
-            if self.use_sift:
-                try:
-                    sift_features = self.sift.detectAndCompute(image_gray_eq, None)
-                except Exception:
-                    pass
-
-            matches = []
-
-            # Compare against all templates
-            for item_id, (template, template_gray, template_gray_eq, template_hist) in self.templates.items():
-                if cancel_event is not None and getattr(cancel_event, 'is_set', lambda: False)():
-                    return []
-
-                score, details = self._calculate_match_score(
-                    image_gray, image_gray_eq, image_hist,
-                    template_gray, template_gray_eq, template_hist,
-                    item_id, orb_features, sift_features
-                )
-                matches.append((item_id, score, details))
+            query = self._prepare_image(image)
 
-            # Sort by score (descending) and return top N
-            matches.sort(key=lambda x: x[1], reverse=True)
+            # Compare against all templates, skipping those that cannot reach the top N
+            results = self._score_templates(query, np.arange(len(self._template_ids)), cancel_event,
+                                            best_score=0.0, keep=top_n)
+            if results is None:
+                return []
+            # Select the top N by score (same order and tie-breaking as a full descending sort)
+            matches = [(self._template_ids[index], score, details)
+                       for index, score, details in heapq.nlargest(top_n, results, key=lambda r: r[1])]
 
             # Print top matches for debugging
-            print(f"\nTop {min(top_n, len(matches))} matches:")
-            for i, (item_id, score, details) in enumerate(matches[:top_n], 1):
+            print(f"\nTop {len(matches)} matches:")
+            for i, (item_id, score, details) in enumerate(matches, 1):
                 print(f"  {i}. {item_id}: {score:.3f}")
                 if details:
                     print(f"     Details: hist={details.get('histogram', 0):.2f}, "
@@ -516,7 +1189,7 @@ class ItemRecognizer:
                           f"orb={details.get('orb_features', 0):.2f}, "
                           f"sift={details.get('sift_features', 0):.2f}")
 
-            return matches[:top_n]
+            return matches
 
         except Exception as e:
             print(f"Error getting top matches: {e}")
@@ -7,7 +7,7 @@ import queue
 import os
 import time
 from functools import lru_cache
-from src.config import OVERLAY_WIDTH, OVERLAY_HEIGHT, OVERLAY_ALPHA, DEFAULT_LANGUAGE
+from src.config import OVERLAY_WIDTH, OVERLAY_HEIGHT, OVERLAY_ALPHA, OVERLAY_QUEUE_POLL_MS, DEFAULT_LANGUAGE
 from src.localization import get_text
 
 # Color schemes for different rarities
@@ -92,54 +92,73 @@ class OverlayUI:
             self.root.withdraw()  # Hide the root window
             self._running = True
 
-            # Process commands from queue
-            def process_queue():
-                try:
-                    while not self._command_queue.empty():
-                        command, args = self._command_queue.get_nowait()
-                        if command == 'show':
-                            # Replace primary window (loading) with item overlay, keep spawned windows
-                            self._create_overlay(*args, close_existing=True)
-                        elif command == 'loading':
-                            # Convert current primary window to spawned, then create new loading as primary
-                            if self.window:
-                                # Move existing primary window to spawned list to keep it open
-                                self._spawned_windows.append(self.window)
-                                self.window = None
-                            self._create_loading_overlay(close_existing=False)
-                        elif command == 'error':
-                            # args: (message,)
-                            message = args[0]
-                            self._create_error_overlay(message, close_existing=True)
-                        elif command == 'spawn':
-                            # args: (item_id,)
-                            item_id = args[0]
-                            item_data = self.database.get_item(item_id)
-                            if item_data:
-                                self._create_overlay(item_data, 0, close_existing=False)
-                        elif command == 'close':
-                            self._close_window()
-                        elif command == 'quit':
-                            self._running = False
-                            self.root.quit()
-                            return
-                except queue.Empty:
-                    pass
-
+            # Commands are normally drained as soon as they are posted (see _post_command);
+            # the slow poll only catches commands whose wake-up could not be delivered
+            def poll_queue():
+                self._process_queue()
                 if self._running:
-                    self.root.after(100, process_queue)
+                    self.root.after(OVERLAY_QUEUE_POLL_MS, poll_queue)
 
-            process_queue()
+            poll_queue()
             self.root.mainloop()
 
         self._gui_thread = threading.Thread(target=gui_loop, daemon=True)
         self._gui_thread.start()
 
         # Wait for GUI thread to initialize
-        import time
         while self.root is None:
             time.sleep(0.01)
 
+    def _process_queue(self):
+        """Run all pending overlay commands (must be called from GUI thread)."""
+        if not self._running:
+            return
+        try:
+            while not self._command_queue.empty():
+                command, args = self._command_queue.get_nowait()
+                if command == 'show':
+                    # Replace primary window (loading) with item overlay, keep spawned windows
+                    self._create_overlay(*args, close_existing=True)
+                elif command == 'loading':
+                    # Convert current primary window to spawned, then create new loading as primary
+                    if self.window:
+                        # Move existing primary window to spawned list to keep it open
+                        self._spawned_windows.append(self.window)
+                        self.window = None
+                    self._create_loading_overlay(close_existing=False)
+                elif command == 'error':
+                    # args: (message,)
+                    message = args[0]
+                    self._create_error_overlay(message, close_existing=True)
+                elif command == 'spawn':
+                    # args: (item_id,)
+                    item_id = args[0]
+                    item_data = self.database.get_item(item_id)
+                    if item_data:
+                        self._create_overlay(item_data, 0, close_existing=False)
+                elif command == 'close':
+                    self._close_window()
+                elif command == 'quit':
+                    self._running = False
+                    self.root.quit()
+                    return
+        except queue.Empty:
+            pass
+
+    def _post_command(self, command, args=()):
+        """
+        Queue a command for the GUI thread and wake it up to run it right away.
+
+        Args:
+            command: Command name handled by _process_queue
+            args: Command arguments
+        """
+        self._command_queue.put((command, args))
+        try:
+            self.root.after(0, self._process_queue)
+        except Exception:
+            pass  # The periodic poll picks the command up
+
     def show(self, item_data, duration=0):
         """
         Show the overlay with item information.
@@ -151,7 +170,7 @@ class OverlayUI:
             item_data: Item data dictionary to display
             duration: Time in seconds before auto-close (0 = no auto-close, default)
         """
-        self._command_queue.put(('show', (item_data, duration)))
+        self._post_command('show', (item_data, duration))
 
     def show_loading(self):
         """Show an overlay immediately with a loading indicator while recognition runs.
@@ -159,7 +178,7 @@ class OverlayUI:
         Note: Converts existing primary window to spawned (keeping it open), then creates
         new loading window as the new primary. This allows multiple item overlays to coexist.
         """
-        self._command_queue.put(('loading', ()))
+        self._post_command('loading')
 
     def show_error(self, message: str):
         """Show an overlay with an error message after a failed recognition or missing data.
@@ -167,7 +186,7 @@ class OverlayUI:
         Args:
             message: Error text to display in the overlay.
         """
-        self._command_queue.put(('error', (message,)))
+        self._post_command('error', (message,))
 
     def _close_window(self, invoke_callback=True):
         """Close the primary overlay window.
@@ -801,7 +820,7 @@ class OverlayUI:
             # Click binding to spawn new overlay if item exists
             if material_item:
                 def _spawn(mid=material_id):
-                    self._command_queue.put(('spawn', (mid,)))
+                    self._post_command('spawn', (mid,))
                 mat_row.bind('<Button-1>', lambda e, f=_spawn: f())
                 bullet.bind('<Button-1>', lambda e, f=_spawn: f())
                 name_label.bind('<Button-1>', lambda e, f=_spawn: f())
@@ -847,7 +866,7 @@ class OverlayUI:
             badge.pack(side=tk.RIGHT, padx=(8, 0))
 
             def _spawn_used(iid=used_item['id']):
-                self._command_queue.put(('spawn', (iid,)))
+                self._post_command('spawn', (iid,))
             # Bind clicks
             item_row.bind('<Button-1>', lambda e, f=_spawn_used: f())
             arrow.bind('<Button-1>', lambda e, f=_spawn_used: f())
@@ -867,7 +886,7 @@ class OverlayUI:
         # Group by bench to make output cleaner
         by_bench = {}
         for entry in usage_entries:
-            bench_id = entry.get('bench_id')
+            bench_id = entry.bench_id
             by_bench.setdefault(bench_id, []).append(entry)
 
         for bench_id, entries in by_bench.items():
@@ -881,8 +900,8 @@ class OverlayUI:
             bench_label.pack(side=tk.LEFT)
             # Individual level requirements
             for e in entries:
-                lvl = e.get('level')
-                qty = e.get('quantity')
+                lvl = e.level
+                qty = e.quantity
                 req_row = tk.Frame(card, bg=COLORS['bg_medium'])
                 req_row.pack(fill=tk.X, pady=1)
                 lvl_label = tk.Label(req_row, text=f"• L{lvl} x{qty}", font=('Segoe UI', 11),
@@ -978,7 +997,7 @@ class OverlayUI:
 
     def cleanup(self):
         """Cleanup overlay resources."""
-        self._command_queue.put(('quit', ()))
+        self._post_command('quit')
         if self._gui_thread and self._gui_thread.is_alive():
             self._gui_thread.join(timeout=2)
         # Ensure all spawned windows are closed
@@ -4,8 +4,11 @@ import mss
 import numpy as np
 import cv2
 import ctypes
-from typing import Optional
-from src.config import CAPTURE_SIZE
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from src.config import CAPTURE_SIZE, USE_DXGI_CAPTURE
 
 try:
     import win32api
@@ -15,13 +18,23 @@ except ImportError:
     WIN32_AVAILABLE = False
     print("Warning: pywin32 not available, cursor position detection may not work")
 
+try:
+    import dxcam
+    DXCAM_AVAILABLE = True
+except ImportError:
+    DXCAM_AVAILABLE = False
+
 
 class ScreenCapture:
     """Handles screen capture at cursor position."""
 
     def __init__(self):
         """Initialize screen capture."""
-        # Don't create mss instance here - create it per-capture to avoid threading issues
+        # mss handles (GDI device contexts on Windows) only work on the thread that created them,
+        # so every mss call runs on one dedicated thread that keeps its instance for the session
+        self._mss_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mss")
+        self._sct = None  # Only touched on the mss thread
+
         # Warm up cursor position detection to avoid first-call issues
         if WIN32_AVAILABLE:
             try:
@@ -34,13 +47,58 @@ class ScreenCapture:
                 _ = win32api.GetCursorPos()
             except:
                 pass
-        # Warm up MSS monitor info to avoid first-call offset issues
+        # Create the mss instance and warm up its monitor info to avoid first-call offset issues
         try:
-            with mss.mss() as sct:
-                _ = sct.monitors
+            self._with_mss(lambda sct: sct.monitors)
         except Exception:
             pass
 
+        # DXGI Desktop Duplication of the primary output (optional). Frames are only
+        # grabbed on demand for a capture, so nothing runs in the background.
+        self._camera = None
+        self._camera_lock = threading.Lock()  # Captures can run on several recognition threads
+        if DXCAM_AVAILABLE and USE_DXGI_CAPTURE:
+            try:
+                self._camera = dxcam.create(output_color="BGR")
+                print("DXGI capture available")
+            except Exception as e:
+                print(f"DXGI capture not available, using mss: {e}")
+                self._camera = None
+
+    def _with_mss(self, func: Callable):
+        """
+        Run func(sct) on the mss thread with the persistent mss instance.
+
+        Args:
+            func: Callable taking the mss instance
+
+        Returns:
+            Result of func (exceptions are re-raised in the calling thread)
+        """
+        return self._mss_executor.submit(self._call_with_mss, func).result()
+
+    def _call_with_mss(self, func: Callable):
+        """Create the mss instance on first use and call func with it (runs on the mss thread)."""
+        if self._sct is None:
+            self._sct = mss.mss()
+        try:
+            return func(self._sct)
+        except Exception:
+            # Recreate the instance on the next call (e.g. after a display change)
+            try:
+                self._close_mss()
+            except Exception:
+                pass
+            raise
+
+    def _close_mss(self):
+        """Close the mss instance if one was created (runs on the mss thread)."""
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            finally:
+                self._sct = None
+
     def get_cursor_position(self) -> tuple:
         """
         Get the current cursor position.
@@ -57,28 +115,32 @@ class ScreenCapture:
                 return (0, 0)
         else:
             # Fallback: return center of primary monitor
-            with mss.mss() as sct:
-                monitor = sct.monitors[1]  # Primary monitor
-                return (monitor["width"] // 2, monitor["height"] // 2)
+            monitor = self._with_mss(lambda sct: sct.monitors[1])  # Primary monitor
+            return (monitor["width"] // 2, monitor["height"] // 2)
 
-    def capture_at_cursor(self, size: tuple = CAPTURE_SIZE, offset: tuple = (0, 0)) -> Optional[np.ndarray]:
+    def capture_at_cursor(self, size: tuple = CAPTURE_SIZE, offset: tuple = (0, 0),
+                          position: Optional[tuple] = None) -> Optional[np.ndarray]:
         """
-        Capture a region of the screen at the current cursor position.
+        Capture a region of the screen at the cursor position.
 
         Args:
             size: Size of the region to capture (width, height)
             offset: Offset from cursor position (x, y). Default (0, 0) centers on cursor
+            position: Cursor position (x, y) to capture at. Defaults to the current cursor position;
+                pass the position the capture frame was placed at so the capture stays inside it
 
         Returns:
             Captured image as numpy array (OpenCV format) or None if capture fails
         """
         try:
-            # Small delay to ensure we get the actual current cursor position
-            import time
-            time.sleep(0.01)  # 10ms delay
+            if position is not None:
+                cursor_x, cursor_y = position
+            else:
+                # Small delay to ensure we get the actual current cursor position
+                time.sleep(0.01)  # 10ms delay
 
-            # Get cursor position
-            cursor_x, cursor_y = self.get_cursor_position()
+                # Get cursor position
+                cursor_x, cursor_y = self.get_cursor_position()
 
             # Debug logging for first few captures (optional; can be removed later)
             # This helps diagnose any remaining offset issues.
@@ -104,22 +166,43 @@ class ScreenCapture:
                 "height": height
             }
 
-            # Capture the screen using context manager for thread safety
-            with mss.mss() as sct:
-                screenshot = sct.grab(monitor)
+            # Fast path: grab just the region through DXGI (primary output only)
+            img = self._grab_from_camera(left, top, width, height)
+            if img is not None:
+                return img
 
-                # Convert to numpy array
-                img = np.array(screenshot)
+            # Capture the screen on the mss thread
+            screenshot = self._with_mss(lambda sct: sct.grab(monitor))
 
-                # Convert from BGRA to BGR (OpenCV format)
-                img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            # Wrap the raw BGRA bytes without copying
+            bgra = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
 
-                return img
+            # Convert from BGRA to BGR (OpenCV format) into a new array owned by the caller
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
 
         except Exception as e:
             print(f"Error capturing screen: {e}")
             return None
 
+    def _grab_from_camera(self, left: int, top: int, width: int, height: int) -> Optional[np.ndarray]:
+        """
+        Grab a region of the primary output through DXGI Desktop Duplication.
+
+        Returns:
+            BGR image (a new array owned by the caller), or None if DXGI capture is unavailable,
+            the region is off the primary output or the screen has not changed since the last grab
+        """
+        if self._camera is None:
+            return None
+        try:
+            if left < 0 or top < 0 or left + width > self._camera.width or top + height > self._camera.height:
+                return None
+            with self._camera_lock:
+                return self._camera.grab(region=(left, top, left + width, top + height))
+        except Exception as e:
+            print(f"DXGI capture failed, falling back to mss: {e}")
+            return None
+
     def capture_region(self, left: int, top: int, width: int, height: int) -> Optional[np.ndarray]:
         """
         Capture a specific region of the screen.
@@ -141,12 +224,11 @@ class ScreenCapture:
                 "height": height
             }
 
-            with mss.mss() as sct:
-                screenshot = sct.grab(monitor)
-                img = np.array(screenshot)
-                img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            screenshot = self._with_mss(lambda sct: sct.grab(monitor))
+            img = np.array(screenshot)
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
 
-                return img
+            return img
 
         except Exception as e:
             print(f"Error capturing region: {e}")
@@ -163,17 +245,17 @@ class ScreenCapture:
             Captured image as numpy array (OpenCV format) or None if capture fails
         """
         try:
-            with mss.mss() as sct:
-                if monitor_number < 1 or monitor_number > len(sct.monitors) - 1:
-                    print(f"Invalid monitor number: {monitor_number}")
-                    return None
+            monitors = self.get_monitor_info()
+            if monitor_number < 1 or monitor_number > len(monitors) - 1:
+                print(f"Invalid monitor number: {monitor_number}")
+                return None
 
-                monitor = sct.monitors[monitor_number]
-                screenshot = sct.grab(monitor)
-                img = np.array(screenshot)
-                img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            monitor = monitors[monitor_number]
+            screenshot = self._with_mss(lambda sct: sct.grab(monitor))
+            img = np.array(screenshot)
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
 
-                return img
+            return img
 
         except Exception as e:
             print(f"Error capturing full screen: {e}")
@@ -186,10 +268,20 @@ class ScreenCapture:
         Returns:
             List of monitor dictionaries
         """
-        with mss.mss() as sct:
-            return sct.monitors
+        return self._with_mss(lambda sct: sct.monitors)
 
     def cleanup(self):
         """Cleanup screen capture resources."""
-        # No cleanup needed - using context managers for mss
-        pass
+        # Close the persistent mss instance on its own thread
+        try:
+            self._mss_executor.submit(self._close_mss).result()
+        except Exception:
+            pass
+        self._mss_executor.shutdown(wait=True)
+
+        if self._camera is not None:
+            try:
+                self._camera.release()
+            except Exception:
+                pass
+            self._camera = None
@@ -35,15 +35,19 @@ LANGUAGE_NAMES = {
 class SettingsGUI:
     """GUI window for application settings."""
 
-    def __init__(self, settings_manager: SettingsManager, on_settings_changed: Optional[Callable] = None):
+    def __init__(self, settings_manager: SettingsManager, on_settings_changed: Optional[Callable] = None,
+                 parent: Optional[tk.Misc] = None):
         """
         Initialize settings GUI.
 
         Args:
             settings_manager: SettingsManager instance
             on_settings_changed: Optional callback when settings are saved
+            parent: Shared Tk root to open the window on (as a Toplevel served by the root's
+                event loop). Without a parent the window gets its own Tk root and event loop.
         """
         self.settings_manager = settings_manager
+        self.parent = parent
         self.on_settings_changed = on_settings_changed
         self.on_close_callback = None  # Callback when window is closed
         self.window = None
@@ -65,7 +69,10 @@ class SettingsGUI:
                 self.window.focus_force()
             return
 
-        if blocking:
+        if self.parent is not None and not blocking:
+            # Create the window on the shared root's GUI thread
+            self.parent.after(0, self._create_window)
+        elif blocking:
             # Create window directly in main thread (blocking)
             self._create_window()
         else:
@@ -75,7 +82,7 @@ class SettingsGUI:
             thread.start()
 
     def _create_window(self):
-        """Create and display the settings window (runs in separate thread)."""
+        """Create and display the settings window (runs in the GUI thread or a separate thread)."""
         try:
             self.is_open = True
 
@@ -85,8 +92,8 @@ class SettingsGUI:
             print(f"  Capture size: {self.settings_manager.get_capture_size()}")
             print(f"  Hotkey: {self.settings_manager.get_recognition_hotkey()}")
 
-            # Create main window
-            self.window = tk.Tk()
+            # Create main window (a Toplevel when sharing the application's Tk root)
+            self.window = tk.Toplevel(self.parent) if self.parent is not None else tk.Tk()
             self.window.title(f"Arc Helper - {get_text(self.language, 'settings_title')}")
             self.window.geometry("700x450")
             self.window.resizable(False, False)
@@ -250,14 +257,16 @@ class SettingsGUI:
             y = (self.window.winfo_screenheight() // 2) - (height // 2)
             self.window.geometry(f'{width}x{height}+{x}+{y}')
 
-            # Start the GUI event loop
-            self.window.mainloop()
+            # Start the GUI event loop (a Toplevel is served by the parent's loop)
+            if self.parent is None:
+                self.window.mainloop()
+                self.is_open = False
+                self.window = None
 
         except Exception as e:
             print(f"Error creating settings window: {e}")
             import traceback
             traceback.print_exc()
-        finally:
             self.is_open = False
             self.window = None
 
@@ -405,8 +414,9 @@ class SettingsGUI:
                 self.height_var = None
                 self.hotkey_var = None
 
-                # Destroy window
-                self.window.quit()
+                # Destroy window (only stop the event loop if the window owns it)
+                if self.parent is None:
+                    self.window.quit()
                 self.window.destroy()
             except:
                 pass
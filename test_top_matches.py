@@ -0,0 +1,40 @@
+"""Test script to verify get_top_matches against a full ranking of every template."""
+
+import cv2
+import numpy as np
+from src.image_recognition import ItemRecognizer
+
+
+def test_top_matches(top_n: int = 5):
+    """Check that the pruned top N matches the top N of an unpruned full scan."""
+    recognizer = ItemRecognizer("Data", None)
+    recognizer.load_templates()
+
+    image = cv2.imread("testing_images/small_icon_1.png", cv2.IMREAD_COLOR)
+    assert image is not None, "Could not load testing_images/small_icon_1.png"
+
+    query = recognizer._prepare_image(image)
+    indices = np.arange(len(recognizer._template_ids))
+
+    # No matches requested: nothing to rank
+    assert recognizer.get_top_matches(image, 0) == []
+    assert recognizer.get_top_matches(image, -1) == []
+    assert recognizer._score_templates(query, indices, best_score=0.0, keep=0) == []
+
+    matches = recognizer.get_top_matches(image, top_n)
+    assert len(matches) == top_n
+
+    # Reference ranking: score every template without pruning
+    scored = recognizer._score_chunk(query, indices, recognizer._batch_scores(query, indices))
+    scored.sort(key=lambda r: r[1], reverse=True)
+
+    expected = [(recognizer._template_ids[index], score) for index, score, _ in scored[:top_n]]
+    assert [(item_id, score) for item_id, score, _ in matches] == expected
+
+
+if __name__ == "__main__":
+    print("Top Matches Test")
+    print("=" * 60)
+    test_top_matches()
+    print("\n" + "=" * 60)
+    print("Testing complete!")